@@ -0,0 +1,109 @@
+import threading
+from collections import Counter
+
+FAIXAS_AUTORES = ['1', '2-5', '>5']
+TOP_AUTORES = 10
+
+
+def _faixa(quantidade):
+    if quantidade <= 0:
+        return None
+    if quantidade == 1:
+        return '1'
+    if quantidade <= 5:
+        return '2-5'
+    return '>5'
+
+
+def _ordenar(contador):
+    return dict(sorted(contador.items(), key=lambda item: (-item[1], item[0])))
+
+
+class AgregadosCatalogo:
+    """Contadores do dashboard mantidos por delta.
+
+    Guarda a contagem por gênero, categoria e autor, além do histograma de
+    autores por faixa de quantidade de livros. Não há cópia por livro: os
+    valores anteriores de cada alteração vêm do próprio DataFrame do
+    snapshot. Cada inclusão, alteração ou exclusão custa O(1); o resumo
+    custa O(valores distintos).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = 0
+        self.generos = Counter()
+        self.categorias = Counter()
+        self.autores = Counter()
+        self.faixas_autores = Counter()
+
+    @classmethod
+    def do_dataframe(cls, df):
+        agregados = cls()
+        agregados.total = len(df)
+        for contador, coluna in ((agregados.generos, 'Gênero'),
+                                 (agregados.categorias, 'Categoria'),
+                                 (agregados.autores, 'Autor')):
+            # value_counts ignora NaN e, nos categóricos, lista categorias sem livros
+            contador.update({valor: int(quantidade)
+                             for valor, quantidade in df[coluna].value_counts().items() if quantidade > 0})
+        agregados.faixas_autores.update(_faixa(quantidade) for quantidade in agregados.autores.values())
+        return agregados
+
+    @staticmethod
+    def _somar(contador, chave, delta):
+        if chave is None or chave != chave:  # ignora None/NaN, como o value_counts
+            return
+        contador[chave] += delta
+        if contador[chave] <= 0:
+            del contador[chave]
+
+    def _contar(self, df, ids, delta):
+        linhas = df.loc[df.index.intersection(ids)]
+        for autor, genero, categoria in zip(
+            linhas['Autor'].tolist(), linhas['Gênero'].tolist(), linhas['Categoria'].tolist()
+        ):
+            self._somar(self.generos, genero, delta)
+            self._somar(self.categorias, categoria, delta)
+            self._mover_autor(autor, delta)
+
+    def _mover_autor(self, autor, delta):
+        anterior = self.autores.get(autor, 0)
+        self._somar(self.autores, autor, delta)
+        atual = self.autores.get(autor, 0)
+        self._somar(self.faixas_autores, _faixa(anterior), -1)
+        self._somar(self.faixas_autores, _faixa(atual), 1)
+
+    def aplicar(self, anterior, atual, ids):
+        """Troca nas contagens os livros `ids` de `anterior` pelos de `atual`
+        (DataFrames do snapshot antes e depois do delta, indexados por ID)."""
+        ids = list(set(ids))
+        with self._lock:
+            self._contar(anterior, ids, -1)
+            self._contar(atual, ids, 1)
+            self.total = len(atual)
+
+    def resumo(self, top=TOP_AUTORES):
+        with self._lock:
+            return resumir_contagens(
+                self.total, self.generos, self.categorias, self.autores,
+                self.faixas_autores, top
+            )
+
+
+def resumir_contagens(total, generos, categorias, autores, faixas_autores=None, top=TOP_AUTORES):
+    """Resumo do dashboard a partir das contagens por valor (de
+    `AgregadosCatalogo` ou de um GROUP BY direto no banco)."""
+    if faixas_autores is None:
+        faixas_autores = Counter(_faixa(quantidade) for quantidade in autores.values())
+    top_autores = sorted(autores.items(), key=lambda item: (-item[1], item[0]))[:top]
+    return {
+        'total_livros': total,
+        'autores_unicos': len(autores),
+        'generos': _ordenar(generos),
+        'categorias': _ordenar(categorias),
+        'top_autores': dict(top_autores),
+        'distribuicao_autores': {
+            faixa: faixas_autores.get(faixa, 0) for faixa in FAIXAS_AUTORES
+        },
+    }
@@ -0,0 +1,61 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ServidorMonitoramento:
+    """Servidor HTTP mínimo, em thread própria, para expor dados internos
+    do app (agregados, métricas) a ferramentas de monitoramento.
+
+    Cada rota é uma função sem argumentos que devolve um objeto
+    serializável em JSON ou uma tupla (content_type, texto).
+    """
+
+    def __init__(self, porta, host='127.0.0.1'):
+        self.host = host
+        self.porta = porta
+        self.rotas = {}
+        self._servidor = None
+
+    def registrar(self, caminho, funcao):
+        self.rotas[caminho] = funcao
+
+    def iniciar(self):
+        rotas = self.rotas
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                funcao = rotas.get(self.path.split('?', 1)[0])
+                if funcao is None:
+                    self.send_error(404)
+                    return
+                try:
+                    resultado = funcao()
+                except Exception as e:
+                    self.send_error(500, str(e))
+                    return
+
+                if isinstance(resultado, tuple):
+                    content_type, texto = resultado
+                else:
+                    content_type = 'application/json; charset=utf-8'
+                    texto = json.dumps(resultado, ensure_ascii=False, default=str)
+                corpo = texto.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self._servidor = ThreadingHTTPServer((self.host, self.porta), Handler)
+        self._servidor.daemon_threads = True
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self
+
+    def parar(self):
+        if self._servidor:
+            self._servidor.shutdown()
+            self._servidor.server_close()
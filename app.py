@@ -1,10 +1,16 @@
 import streamlit as st
-import bcrypt
-import json
-import os
-import requests
-import pandas as pd
-from datetime import datetime
+import importlib
+import logging
+from email.utils import formatdate
+
+# Só o necessário para a tela de login; pandas, requests e as páginas do
+# catálogo são importados no primeiro acesso a cada página
+from api_monitoramento import ServidorMonitoramento
+from autenticacao import LimitadorTentativas, ServicoOcupado, ServicoSenhas
+from estado_compartilhado import Sessoes
+from metricas import REGISTRO, contar, cronometrado, iniciar_perfil, medir
+from recursos import PROXIES_CONFIAVEIS, obter_catalogo, obter_estado
+from usuarios import RepositorioUsuarios
 
 # Configurações iniciais
 if 'login_status' not in st.session_state:
@@ -20,58 +26,153 @@ if 'editing_book' not in st.session_state:
     st.session_state.editing_book = None
 
 # Constantes
-USERS_FILE = 'users.json'
-API_URL = "http://localhost:8080"
+USERS_FILE = 'users.json'  # formato antigo, migrado para USERS_DB
+USERS_DB = 'usuarios.db'
+MONITOR_HOST = "127.0.0.1"
+MONITOR_PORTA = 8090
+CUSTO_BCRYPT = 12  # alterar regrava os hashes no próximo login de cada usuário
+TENTATIVAS_POR_USUARIO = 5
+TENTATIVAS_POR_IP = 20
+JANELA_TENTATIVAS_S = 60
+COOKIE_SESSAO = 'biblioteca_sessao'
+
+# Menu -> (módulo, função) da página
+PAGINAS = {
+    "📖 Listar Livros": ('pagina_livros', 'listar_livros'),
+    "➕ Adicionar Livro": ('pagina_livros', 'adicionar_livro'),
+    "📥 Importar Livros": ('pagina_importacao', 'importar_livros'),
+    "📊 Dashboard": ('pagina_dashboard', 'dashboard'),
+}
+PAGINAS_ADMIN = {"➕ Adicionar Livro", "📥 Importar Livros"}
+
+@st.cache_resource
+def iniciar_monitoramento():
+    # API JSON para monitoramento (ex.: GET http://127.0.0.1:8090/agregados)
+    servidor = ServidorMonitoramento(MONITOR_PORTA, host=MONITOR_HOST)
+    servidor.registrar('/agregados', lambda: obter_catalogo().obter_agregados())
+    servidor.registrar('/metricas', REGISTRO.exportar_json)
+    servidor.registrar('/metrics', lambda: ('text/plain; version=0.0.4; charset=utf-8',
+                                            REGISTRO.exportar_prometheus()))
+    try:
+        return servidor.iniciar()
+    except OSError:
+        # Porta ocupada (ex.: outra réplica no mesmo host)
+        return None
 
 # Funções de autenticação
-def load_users():
-    if os.path.exists(USERS_FILE):
-        with open(USERS_FILE, 'r') as f:
-            return json.load(f)
-    default_users = {
-        "admin": {
-            "password": bcrypt.hashpw("admin123".encode(), bcrypt.gensalt()).decode(),
-            "role": "admin",
-            "name": "Administrador"
-        },
-        "user": {
-            "password": bcrypt.hashpw("user123".encode(), bcrypt.gensalt()).decode(),
-            "role": "user",
-            "name": "Usuário"
-        }
+@st.cache_resource
+def obter_servico_senhas():
+    return ServicoSenhas(custo=CUSTO_BCRYPT)
+
+@st.cache_resource
+def obter_limitadores():
+    # Contagem no estado compartilhado: o limite vale para todas as réplicas juntas
+    estado = obter_estado()
+    return {
+        'usuario': LimitadorTentativas(estado, 'usuario', TENTATIVAS_POR_USUARIO, JANELA_TENTATIVAS_S),
+        'ip': LimitadorTentativas(estado, 'ip', TENTATIVAS_POR_IP, JANELA_TENTATIVAS_S),
     }
-    save_users(default_users)
-    return default_users
 
-def save_users(users):
-    with open(USERS_FILE, 'w') as f:
-        json.dump(users, f)
+@st.cache_resource
+def obter_sessoes():
+    return Sessoes(obter_estado())
+
+@st.cache_resource
+def obter_usuarios():
+    # Executa uma vez por processo: cria a tabela, migra o users.json e semeia os padrões
+    repositorio = RepositorioUsuarios(USERS_DB)
+    repositorio.migrar_json(USERS_FILE)
+    if repositorio.total() == 0:
+        senhas = obter_servico_senhas()
+        repositorio.criar("admin", senhas.gerar_hash("admin123"), "admin", "Administrador")
+        repositorio.criar("user", senhas.gerar_hash("user123"), "user", "Usuário")
+    return repositorio
+
+@st.cache_resource
+def avisar_proxy_nao_configurado():
+    # Uma vez por processo
+    logging.getLogger(__name__).warning(
+        "Requisição com X-Forwarded-For, mas BIBLIOTECA_PROXIES_CONFIAVEIS não está definida: "
+        "atrás de um proxy, todos os clientes dividem o mesmo limite de tentativas por IP"
+    )
+
+def ip_cliente():
+    # O Streamlit devolve None para conexões de localhost
+    conexao = getattr(st.context, "ip_address", None) or "127.0.0.1"
+    if conexao not in PROXIES_CONFIAVEIS:
+        if not PROXIES_CONFIAVEIS and isinstance(st.context.headers.get("X-Forwarded-For"), str):
+            avisar_proxy_nao_configurado()
+        return conexao
+    # Atrás de proxy confiável, o cliente é o último endereço do
+    # X-Forwarded-For que não é um dos proxies (os anteriores vêm do cliente)
+    encaminhados = [e.strip() for e in st.context.headers.get("X-Forwarded-For", "").split(",") if e.strip()]
+    for endereco in reversed(encaminhados):
+        if endereco not in PROXIES_CONFIAVEIS:
+            return endereco
+    return encaminhados[0] if encaminhados else conexao
 
+def verificar_limite(*chaves):
+    # Devolve a mensagem de bloqueio ou None se a tentativa for permitida
+    limitadores = obter_limitadores()
+    for tipo, valor in chaves:
+        espera = limitadores[tipo].registrar(valor)
+        if espera:
+            return f"Muitas tentativas. Tente novamente em {int(espera) + 1}s"
+    return None
+
+@cronometrado('login')
 def login(username, password):
-    users = load_users()
-    if username in users:
-        if bcrypt.checkpw(password.encode(), users[username]['password'].encode()):
-            st.session_state.login_status = True
-            st.session_state.user_info = {
-                'username': username,
-                'role': users[username]['role'],
-                'name': users[username]['name']
-            }
-            return True
-    return False
+    bloqueio = verificar_limite(('ip', ip_cliente()), ('usuario', username))
+    if bloqueio:
+        return False, bloqueio
+    
+    usuario = obter_usuarios().buscar(username)
+    if not usuario:
+        return False, "Usuário ou senha incorretos"
+    
+    senhas = obter_servico_senhas()
+    try:
+        if not senhas.verificar(password, usuario['password']):
+            return False, "Usuário ou senha incorretos"
+    except ServicoOcupado as e:
+        return False, str(e)
+    
+    # Custo do bcrypt mudou: regrava o hash com o custo atual. A senha já foi
+    # conferida, então com o pool ocupado a regravação fica para outro login
+    if senhas.precisa_rehash(usuario['password']):
+        try:
+            obter_usuarios().atualizar_senha(username, senhas.gerar_hash(password))
+        except ServicoOcupado:
+            contar('bcrypt_rehash_adiado')
+    
+    st.session_state.login_status = True
+    st.session_state.user_info = {
+        'username': username,
+        'role': usuario['role'],
+        'name': usuario['name']
+    }
+    # Sessão no estado compartilhado; o token no cookie permite que qualquer
+    # réplica restaure o login (ex.: após failover do balanceador)
+    token, expira_em = obter_sessoes().criar(st.session_state.user_info)
+    st.session_state.sessao = token
+    st.session_state.cookie_pendente = (token, expira_em)
+    st.session_state.sessao_encerrada = False
+    return True, "Login realizado com sucesso!"
 
 def register(username, password, name, role="user"):
-    users = load_users()
-    if username in users:
+    bloqueio = verificar_limite(('ip', ip_cliente()))
+    if bloqueio:
+        return False, bloqueio
+    
+    if obter_usuarios().buscar(username):
         return False, "Usuário já existe"
     
-    hashed_pw = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
-    users[username] = {
-        "password": hashed_pw,
-        "role": role,
-        "name": name
-    }
-    save_users(users)
+    try:
+        hashed_pw = obter_servico_senhas().gerar_hash(password)
+    except ServicoOcupado as e:
+        return False, str(e)
+    if not obter_usuarios().criar(username, hashed_pw, role, name):
+        return False, "Usuário já existe"
     return True, "Usuário registrado com sucesso"
 
 # Páginas de autenticação
@@ -84,11 +185,12 @@ def login_page():
         submit = st.form_submit_button("Entrar")
         
         if submit:
-            if login(username, password):
-                st.success("Login realizado com sucesso!")
+            success, message = login(username, password)
+            if success:
+                st.success(message)
                 st.rerun()
             else:
-                st.error("Usuário ou senha incorretos")
+                st.error(message)
 
     if st.button("Criar nova conta"):
         st.session_state.page = "register"
@@ -123,375 +225,49 @@ def register_page():
         st.session_state.page = "login"
         st.rerun()
 
-def editar_livro(livro):
-    st.subheader(f"📝 Editar Livro: {livro['Título']}")
-    
-    with st.form(key=f"edit_form_{livro['ID']}", clear_on_submit=False):
-        novo_titulo = st.text_input("Título*", value=livro['Título'])
-        novo_autor = st.text_input("Autor*", value=livro['Autor'])
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            generos = ["Romance", "Ficção Científica", "Fantasia", 
-                      "Técnico", "Biografia", "História",
-                      "Autoajuda", "Infantil", "Outro"]
-            novo_genero = st.selectbox(
-                "Gênero",
-                options=generos,
-                index=generos.index(livro['Gênero']) if livro['Gênero'] in generos else 0
-            )
-        
-        with col2:
-            categorias = ["Livro Físico", "E-book", "Audiobook",
-                         "Revista", "Artigo", "Outro"]
-            nova_categoria = st.selectbox(
-                "Categoria",
-                options=categorias,
-                index=categorias.index(livro['Categoria']) if livro['Categoria'] in categorias else 0
-            )
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            submitted = st.form_submit_button("💾 Salvar Alterações")
-        with col2:
-            cancelar = st.form_submit_button("❌ Cancelar")
-        
-        if submitted:
-            if not novo_titulo or not novo_autor:
-                st.error("❌ Título e autor são campos obrigatórios!")
-                return False
-            
-            dados_atualizados = {
-                "titulo": novo_titulo,
-                "autor": novo_autor,
-                "genero": novo_genero,
-                "categoria": nova_categoria
-            }
-            
-            try:
-                response = requests.put(
-                    f"{API_URL}/livros/{livro['ID']}",
-                    json=dados_atualizados
-                )
-                
-                if response.status_code == 200:
-                    st.success("✅ Livro atualizado com sucesso!")
-                    return True
-                else:
-                    st.error(f"❌ Erro ao atualizar livro: {response.text}")
-                    return False
-            except Exception as e:
-                st.error(f"❌ Erro: {str(e)}")
-                return False
-        
-        if cancelar:
-            return True
-    
-    return False
-
-def adicionar_livro():
-    st.header("➕ Adicionar Novo Livro")
-    
-    with st.form(key="form_livro", clear_on_submit=True):
-        st.subheader("Informações do Livro")
-        
-        titulo = st.text_input("Título do Livro*")
-        autor = st.text_input("Nome do Autor*")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            genero = st.selectbox("Gênero", [
-                "Romance", "Ficção Científica", "Fantasia", 
-                "Técnico", "Biografia", "História",
-                "Autoajuda", "Infantil", "Outro"
-            ])
-        
-        with col2:
-            categoria = st.selectbox("Categoria", [
-                "Livro Físico", "E-book", "Audiobook",
-                "Revista", "Artigo", "Outro"
-            ])
-        
-        submitted = st.form_submit_button("📚 Cadastrar Livro")
-        
-        if submitted:
-            if not titulo or not autor:
-                st.error("❌ Título e autor são campos obrigatórios!")
-                return
-            
-            novo_livro = {
-                "titulo": titulo,
-                "autor": autor,
-                "genero": genero,
-                "categoria": categoria
-            }
-            
-            try:
-                response = requests.post(f"{API_URL}/livros", json=novo_livro)
-                if response.status_code == 201:
-                    st.success("✅ Livro cadastrado com sucesso!")
-                    st.json(response.json())
-                else:
-                    st.error(f"❌ Erro ao cadastrar livro: {response.text}")
-            except requests.exceptions.ConnectionError:
-                st.error("❌ Erro de conexão com o servidor!")
-            except Exception as e:
-                st.error(f"❌ Erro inesperado: {str(e)}")
+def gravar_cookie_sessao(token, expira_em):
+    # st.context.cookies só lê: o cookie é gravado por um script na página
+    # (o iframe do st.iframe tem acesso à mesma origem do app)
+    st.iframe(f"""<style>body {{ margin: 0; }}</style><script>
+    const seguro = window.parent.location.protocol === 'https:' ? '; Secure' : '';
+    window.parent.document.cookie = '{COOKIE_SESSAO}={token}; expires={formatdate(expira_em, usegmt=True)}; '
+        + 'path=/; SameSite=Strict' + seguro;
+    </script>""")
 
-def listar_livros():
-    st.header("📚 Biblioteca Digital")
-    
-    try:
-        response = requests.get(f"{API_URL}/livros")
-        if response.status_code == 200:
-            livros = response.json()
-            if not livros:
-                st.info("📢 Nenhum livro cadastrado ainda.")
-                return
-            
-            df = pd.DataFrame(livros)
-            df.columns = ['ID', 'Título', 'Autor', 'Gênero', 'Categoria']
-            
-            # Filtros
-            with st.expander("🔍 Filtros de Busca", expanded=True):
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    busca = st.text_input("🔎 Buscar por título ou autor")
-                
-                with col2:
-                    generos = st.multiselect(
-                        "Filtrar por Gênero",
-                        options=sorted(df['Gênero'].unique())
-                    )
-                
-                with col3:
-                    categorias = st.multiselect(
-                        "Filtrar por Categoria",
-                        options=sorted(df['Categoria'].unique())
-                    )
-                
-                # Aplicar filtros
-                df_filtrado = df.copy()
-                if busca:
-                    mask = (
-                        df_filtrado['Título'].str.contains(busca, case=False) |
-                        df_filtrado['Autor'].str.contains(busca, case=False)
-                    )
-                    df_filtrado = df_filtrado[mask]
-                if generos:
-                    df_filtrado = df_filtrado[df_filtrado['Gênero'].isin(generos)]
-                if categorias:
-                    df_filtrado = df_filtrado[df_filtrado['Categoria'].isin(categorias)]
-                
-                # Métricas
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Total de Livros", len(df))
-                with col2:
-                    st.metric("Livros Filtrados", len(df_filtrado))
-                with col3:
-                    percentual = (len(df_filtrado) / len(df) * 100) if len(df) > 0 else 0
-                    st.metric("Percentual", f"{percentual:.1f}%")
-            
-            # Tabela principal
-            st.dataframe(
-                df_filtrado,
-                column_config={
-                    "ID": st.column_config.NumberColumn("ID", help="Identificador único"),
-                    "Título": st.column_config.TextColumn("Título", help="Título do livro", width="large"),
-                    "Autor": st.column_config.TextColumn("Autor", help="Nome do autor"),
-                    "Gênero": st.column_config.TextColumn("Gênero", help="Gênero literário"),
-                    "Categoria": st.column_config.TextColumn("Categoria", help="Tipo do livro")
-                },
-                hide_index=True,
-            )
-            
-            # Gerenciamento (apenas para admin)
-            if st.session_state.user_info['role'] == 'admin':
-                st.markdown("---")
-                st.subheader("🛠️ Gerenciar Livros")
-                
-                livro_selecionado = st.selectbox(
-                    "Selecione um livro para gerenciar:",
-                    options=df_filtrado.to_dict('records'),
-                    format_func=lambda x: f"{x['Título']} - {x['Autor']}"
-                )
-                
-                if livro_selecionado:
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button("📝 Editar"):
-                            st.session_state.editing = True
-                            st.session_state.editing_book = livro_selecionado
-                            st.rerun()
-                    
-                    with col2:
-                        if st.button("🗑️ Excluir"):
-                            st.warning(f"🚨 Tem certeza que deseja excluir '{livro_selecionado['Título']}'?")
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                if st.button("✅ Sim, excluir"):
-                                    try:
-                                        response = requests.delete(f"{API_URL}/livros/{livro_selecionado['ID']}")
-                                        if response.status_code == 204:
-                                            st.success("✅ Livro excluído com sucesso!")
-                                            st.rerun()
-                                        else:
-                                            st.error("❌ Erro ao excluir livro!")
-                                    except Exception as e:
-                                        st.error(f"❌ Erro: {str(e)}")
-                            with col2:
-                                if st.button("❌ Não, cancelar"):
-                                    st.rerun()
-                
-                # Mostrar formulário de edição se estiver editando
-                if st.session_state.get('editing', False) and st.session_state.get('editing_book'):
-                    if editar_livro(st.session_state.editing_book):
-                        st.session_state.editing = False
-                        st.session_state.editing_book = None
-                        st.rerun()
-                    
-    except requests.exceptions.ConnectionError:
-        st.error("❌ Erro de conexão com o servidor!")
-    except Exception as e:
-        st.error(f"❌ Erro ao carregar livros: {str(e)}")
+def restaurar_sessao():
+    # Token na URL (versão anterior) não vale mais: vazava por histórico, links e logs
+    if 'sessao' in st.query_params:
+        del st.query_params['sessao']
+    token = st.context.cookies.get(COOKIE_SESSAO)
+    # Fora do servidor (ex.: AppTest) o contexto não traz cookies de verdade
+    if not isinstance(token, str) or not token:
+        return
+    # Cada restauração troca o token; o prazo continua contando do login
+    token, sessao = obter_sessoes().trocar(token)
+    if token is None:
+        st.session_state.cookie_pendente = ('', 0)
+        return
+    st.session_state.login_status = True
+    st.session_state.user_info = sessao['usuario']
+    st.session_state.sessao = token
+    st.session_state.cookie_pendente = (token, sessao['expira_em'])
 
-@st.cache_data(ttl=300)
-def load_dashboard_data():
-    try:
-        response = requests.get(f"{API_URL}/livros")
-        if response.status_code == 200:
-            return pd.DataFrame(response.json())
-        return pd.DataFrame()
-    except:
-        return pd.DataFrame()
+def encerrar_sessao():
+    token = st.session_state.get('sessao')
+    if token:
+        obter_sessoes().encerrar(token)
+    st.session_state.sessao = None
+    st.session_state.cookie_pendente = ('', 0)
+    # st.context.cookies continua com o cookie lido na abertura da página:
+    # sem isto, a próxima execução restauraria o login com ele
+    st.session_state.sessao_encerrada = True
 
-def dashboard():
-    st.header("📊 Dashboard")
-    
-    try:
-        df = load_dashboard_data()
-        if df.empty:
-            st.info("📢 Nenhum dado disponível para análise.")
-            return
-        
-        df.columns = ['ID', 'Título', 'Autor', 'Gênero', 'Categoria']
-        
-        # Métricas gerais
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Total de Livros", len(df))
-        with col2:
-            st.metric("Autores Únicos", df['Autor'].nunique())
-        with col3:
-            st.metric("Gêneros", df['Gênero'].nunique())
-        with col4:
-            st.metric("Categorias", df['Categoria'].nunique())
-        
-        st.markdown("---")
-        
-        # Análises por gênero e categoria
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("📊 Distribuição por Gênero")
-            generos_count = df['Gênero'].value_counts()
-            st.bar_chart(generos_count)
-            
-            st.markdown("### Detalhamento por Gênero")
-            generos_df = pd.DataFrame({
-                'Gênero': generos_count.index,
-                'Quantidade': generos_count.values,
-                'Percentual': (generos_count.values / len(df) * 100).round(1)
-            })
-            generos_df['Percentual'] = generos_df['Percentual'].apply(lambda x: f"{x}%")
-            st.dataframe(generos_df, hide_index=True)
-        
-        with col2:
-            st.subheader("📊 Distribuição por Categoria")
-            categorias_count = df['Categoria'].value_counts()
-            st.bar_chart(categorias_count)
-            
-            st.markdown("### Detalhamento por Categoria")
-            categorias_df = pd.DataFrame({
-                'Categoria': categorias_count.index,
-                'Quantidade': categorias_count.values,
-                'Percentual': (categorias_count.values / len(df) * 100).round(1)
-            })
-            categorias_df['Percentual'] = categorias_df['Percentual'].apply(lambda x: f"{x}%")
-            st.dataframe(categorias_df, hide_index=True)
-        
-        st.markdown("---")
-        
-        # Análise de autores
-        st.subheader("👥 Análise de Autores")
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("### Top 10 Autores")
-            top_autores = df['Autor'].value_counts().head(10)
-            st.bar_chart(top_autores)
-            
-            top_autores_df = pd.DataFrame({
-                'Autor': top_autores.index,
-                'Quantidade': top_autores.values,
-                'Percentual': (top_autores.values / len(df) * 100).round(1)
-            })
-            top_autores_df['Percentual'] = top_autores_df['Percentual'].apply(lambda x: f"{x}%")
-            st.dataframe(top_autores_df, hide_index=True)
-        
-        with col2:
-            st.markdown("### Distribuição de Livros por Autor")
-            livros_por_autor = df['Autor'].value_counts()
-            distribuicao_df = pd.DataFrame({
-                'Categoria': [
-                    'Autores com 1 livro',
-                    'Autores com 2-5 livros',
-                    'Autores com mais de 5 livros'
-                ],
-                'Quantidade': [
-                    (livros_por_autor == 1).sum(),
-                    ((livros_por_autor >= 2) & (livros_por_autor <= 5)).sum(),
-                    (livros_por_autor > 5).sum()
-                ]
-            })
-            st.dataframe(distribuicao_df, hide_index=True)
-        
-        # Exportação de dados
-        st.markdown("---")
-        st.subheader("📥 Exportar Dados")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            # CSV
-            csv = df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                "📄 Baixar CSV",
-                data=csv,
-                file_name=f'biblioteca_dados_{datetime.now().strftime("%Y%m%d")}.csv',
-                mime='text/csv'
-            )
-        
-        with col2:
-            # Excel
-            buffer = pd.ExcelWriter(f'biblioteca_dados_{datetime.now().strftime("%Y%m%d")}.xlsx', 
-                                  engine='xlsxwriter')
-            df.to_excel(buffer, index=False, sheet_name='Dados')
-            buffer.save()
-            
-            with open(buffer.name, 'rb') as f:
-                excel_data = f.read()
-            
-            st.download_button(
-                "📊 Baixar Excel",
-                data=excel_data,
-                file_name=f'biblioteca_dados_{datetime.now().strftime("%Y%m%d")}.xlsx',
-                mime='application/vnd.ms-excel'
-            )
-            
-    except Exception as e:
-        st.error(f"❌ Erro ao gerar dashboard: {str(e)}")
+def abrir_pagina(menu):
+    # O import fica em sys.modules: só o primeiro acesso paga o carregamento
+    nome_modulo, nome_funcao = PAGINAS[menu]
+    with medir(f"importacao {nome_modulo}"):
+        modulo = importlib.import_module(nome_modulo)
+    getattr(modulo, nome_funcao)()
 
 def main():
     # Configuração da página
@@ -502,14 +278,19 @@ def main():
         initial_sidebar_state="expanded"
     )
 
+    iniciar_monitoramento()
+    perfil = iniciar_perfil()
+    
     # Inicialização de estados
     if 'page' not in st.session_state:
         st.session_state.page = "login"
     
-    # Verificar arquivo de usuários
-    if not os.path.exists(USERS_FILE):
-        users = load_users()
-        save_users(users)
+    # Sessão nova (outra aba, recarga ou outra réplica): tenta o cookie
+    if not st.session_state.login_status and not st.session_state.get('sessao_encerrada'):
+        restaurar_sessao()
+    cookie = st.session_state.pop('cookie_pendente', None)
+    if cookie:
+        gravar_cookie_sessao(*cookie)
     
     # Fluxo principal
     if not st.session_state.login_status:
@@ -529,11 +310,17 @@ def main():
             menu_options = ["📖 Listar Livros", "📊 Dashboard"]
             if st.session_state.user_info['role'] == "admin":
                 menu_options.insert(1, "➕ Adicionar Livro")
+                menu_options.insert(2, "📥 Importar Livros")
             
             menu = st.radio("Menu", menu_options)
             
             st.markdown("---")
+            mostrar_perfil = False
+            if st.session_state.user_info['role'] == "admin":
+                mostrar_perfil = st.checkbox("⏱️ Mostrar perfil de desempenho")
+            
             if st.button("🚪 Sair"):
+                encerrar_sessao()
                 st.session_state.login_status = False
                 st.session_state.user_info = None
                 st.session_state.editing = False
@@ -541,12 +328,17 @@ def main():
                 st.rerun()
         
         # Conteúdo principal
-        if menu == "📖 Listar Livros":
-            listar_livros()
-        elif menu == "➕ Adicionar Livro" and st.session_state.user_info['role'] == "admin":
-            adicionar_livro()
-        elif menu == "📊 Dashboard":
-            dashboard()
+        with medir(f"pagina {menu}"):
+            if menu not in PAGINAS_ADMIN or st.session_state.user_info['role'] == "admin":
+                abrir_pagina(menu)
+        
+        # Perfil desta execução do script (apenas admin)
+        if mostrar_perfil:
+            import pandas as pd
+            with st.sidebar.expander("⏱️ Perfil desta execução", expanded=True):
+                perfil_df = pd.DataFrame(perfil, columns=['Operação', 'Segundos'])
+                perfil_df['ms'] = (perfil_df['Segundos'] * 1000).round(2)
+                st.dataframe(perfil_df[['Operação', 'ms']], hide_index=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as TempoEsgotado
+
+import bcrypt
+
+import metricas
+
+CUSTO_BCRYPT = 12
+# bcrypt libera o GIL, então threads bastam para usar vários núcleos
+WORKERS_SENHAS = max(1, (os.cpu_count() or 2) // 2)
+TIMEOUT_SENHA = 30
+# Vagas na fila por worker: quantos hashes cabem no timeout, com folga para
+# quem entra por último ainda ser atendido a tempo; nunca menos que o mínimo
+FOLGA_FILA = 0.5
+FILA_MINIMA_POR_WORKER = 4
+
+
+class ServicoOcupado(Exception):
+    pass
+
+
+def custo_do_hash(hash_senha):
+    # Formato: $2b$<custo>$<salt+hash>
+    try:
+        return int(hash_senha.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def estimar_tempo_hash(custo):
+    """Segundos de um hash bcrypt com `custo` neste host, estimados por um
+    hash 16 vezes mais barato (cada unidade de custo dobra o tempo)."""
+    base = max(4, custo - 4)
+    inicio = time.perf_counter()
+    bcrypt.hashpw(b'calibracao', bcrypt.gensalt(rounds=base))
+    return (time.perf_counter() - inicio) * 2 ** (custo - base)
+
+
+@metricas.cronometrado('bcrypt_verificar')
+def _verificar(senha, hash_senha):
+    return bcrypt.checkpw(senha, hash_senha)
+
+
+class ServicoSenhas:
+    """Hash e verificação de senhas bcrypt em um pool limitado de threads.
+
+    A fila de espera é limitada: quando cheia, a chamada falha na hora com
+    `ServicoOcupado` em vez de acumular trabalho que travaria as demais
+    sessões. Passado o `timeout`, a espera também termina com
+    `ServicoOcupado`. Sem `fila_maxima`, o tamanho da fila sai do tempo de
+    um hash medido na criação: o que os workers atendem dentro do timeout.
+    """
+
+    def __init__(self, custo=CUSTO_BCRYPT, workers=WORKERS_SENHAS,
+                 fila_maxima=None, timeout=TIMEOUT_SENHA):
+        self.custo = custo
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        if fila_maxima is None:
+            por_worker = int(timeout * FOLGA_FILA / estimar_tempo_hash(custo))
+            fila_maxima = workers * max(FILA_MINIMA_POR_WORKER, por_worker)
+        self.fila_maxima = fila_maxima
+        self._vagas = threading.BoundedSemaphore(fila_maxima)
+
+    def _executar(self, funcao, *args):
+        if not self._vagas.acquire(blocking=False):
+            metricas.contar('bcrypt_recusado_ocupado')
+            raise ServicoOcupado("Muitas requisições de autenticação; tente novamente em instantes")
+        try:
+            futuro = self._executor.submit(funcao, *args)
+        except Exception:
+            self._vagas.release()
+            raise
+        futuro.add_done_callback(lambda _: self._vagas.release())
+        try:
+            return futuro.result(timeout=self.timeout)
+        except TempoEsgotado:
+            # Ainda na fila: sai dela; já em execução, termina sozinho
+            futuro.cancel()
+            metricas.contar('bcrypt_timeout')
+            raise ServicoOcupado("Autenticação demorou demais; tente novamente em instantes") from None
+
+    def gerar_hash(self, senha):
+        @metricas.cronometrado('bcrypt_hash')
+        def _hash():
+            return bcrypt.hashpw(senha.encode(), bcrypt.gensalt(rounds=self.custo)).decode()
+        return self._executar(_hash)
+
+    def verificar(self, senha, hash_senha):
+        return self._executar(_verificar, senha.encode(), hash_senha.encode())
+
+    def precisa_rehash(self, hash_senha):
+        return custo_do_hash(hash_senha) != self.custo
+
+    def encerrar(self):
+        self._executor.shutdown(wait=False)
+
+
+class LimitadorTentativas:
+    """Limite de tentativas por chave (ex.: usuário ou IP) em janelas fixas
+    de `janela_s` segundos.
+
+    A contagem fica no estado compartilhado (estado_compartilhado.py), então
+    o limite vale para todas as réplicas juntas, e não para cada uma.
+    """
+
+    def __init__(self, estado, nome, limite, janela_s):
+        self.estado = estado
+        self.nome = nome
+        self.limite = limite
+        self.janela_s = janela_s
+
+    def registrar(self, chave):
+        """Registra uma tentativa. Devolve 0 se permitida ou, se bloqueada,
+        quantos segundos faltam para a próxima."""
+        agora = time.time()
+        janela = int(agora // self.janela_s)
+        chave_estado = f'tentativas:{self.nome}:{janela}:{chave}'
+        total = int(self.estado.incr(chave_estado))
+        if total == 1:
+            self.estado.expire(chave_estado, self.janela_s * 2)
+        if total > self.limite:
+            metricas.contar(f'tentativas_bloqueadas {self.nome}')
+            return (janela + 1) * self.janela_s - agora
+        return 0
@@ -0,0 +1,69 @@
+"""Compara a busca do índice invertido com o scan `str.contains` do pandas.
+
+Uso: python benchmarks/busca.py [tamanhos...]   (padrão: 10000 100000 1000000)
+"""
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dados import gerar_livros  # noqa: E402
+from indice_busca import IndiceBusca  # noqa: E402
+
+CONSULTAS = ["usuario", "Príncipe", "sil", "jo", "guerra mar", "inexistente"]
+REPETICOES = 5
+
+
+def gerar_catalogo(n, semente=42):
+    livros = gerar_livros(n, semente)
+    return pd.DataFrame({
+        'ID': [livro['id'] for livro in livros],
+        'Título': [livro['titulo'] for livro in livros],
+        'Autor': [livro['autor'] for livro in livros],
+    })
+
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    for _ in range(REPETICOES):
+        resultado = funcao()
+    return (time.perf_counter() - inicio) / REPETICOES * 1000, resultado
+
+
+def scan_pandas(df, busca):
+    mask = (
+        df['Título'].str.contains(busca, case=False, regex=False) |
+        df['Autor'].str.contains(busca, case=False, regex=False)
+    )
+    return df[mask]
+
+
+def executar(tamanhos):
+    resultados = []
+    for n in tamanhos:
+        df = gerar_catalogo(n)
+        inicio = time.perf_counter()
+        indice = IndiceBusca.do_dataframe(df)
+        construcao_ms = (time.perf_counter() - inicio) * 1000
+
+        for consulta in CONSULTAS:
+            pandas_ms, filtrado = cronometrar(lambda: scan_pandas(df, consulta))
+            indice_ms, ids = cronometrar(lambda: indice.buscar(consulta))
+            resultados.append({
+                'livros': n,
+                'consulta': consulta,
+                'construcao_indice_ms': round(construcao_ms, 1),
+                'pandas_ms': round(pandas_ms, 3),
+                'indice_ms': round(indice_ms, 3),
+                'resultados_pandas': len(filtrado),
+                'resultados_indice': len(ids),
+            })
+    return resultados
+
+
+if __name__ == "__main__":
+    tamanhos = [int(t) for t in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    print(pd.DataFrame(executar(tamanhos)).to_string(index=False))
@@ -0,0 +1,29 @@
+"""Catálogo sintético e reproduzível para os benchmarks."""
+import random
+
+from catalogo import CATEGORIAS, GENEROS
+
+PALAVRAS = ["código", "príncipe", "história", "noite", "mar", "usuário", "sombra",
+            "cidade", "jardim", "ciência", "guerra", "amor", "viagem", "tempo",
+            "memória", "segredo", "ilha", "estrela", "caminho", "fogo"]
+NOMES = ["Ana", "João", "Márcia", "Luís", "Beatriz", "Antônio", "Clara", "José"]
+SOBRENOMES = ["Silva", "Souza", "Araújo", "Pereira", "Gonçalves", "Lima", "Brown"]
+
+
+def gerar_livros(n, semente=42, primeiro_id=1):
+    """Lista de livros no formato da API ({id, titulo, autor, genero, categoria})."""
+    aleatorio = random.Random(semente)
+    autores_distintos = max(1, n // 20)
+    return [
+        {
+            'id': id_livro,
+            'titulo': " ".join(
+                aleatorio.choice(PALAVRAS) for _ in range(aleatorio.randint(2, 5))
+            ).capitalize(),
+            'autor': (f"{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)} "
+                      f"{aleatorio.randrange(autores_distintos)}"),
+            'genero': aleatorio.choice(GENEROS),
+            'categoria': aleatorio.choice(CATEGORIAS),
+        }
+        for id_livro in range(primeiro_id, primeiro_id + n)
+    ]
@@ -0,0 +1,353 @@
+"""Suite de benchmarks reproduzível contra a API local (servidor_local.py).
+
+Para cada tamanho de catálogo sobe um backend SQLite em memória com livros
+sintéticos e mede:
+  - listagem: página do servidor (com e sem filtros e busca) e sugestões do índice local
+  - dashboard: carga completa do snapshot, agregados e sincronização delta
+  - exportação: tempo e tamanho do arquivo em cada formato disponível
+  - concorrência: muitas sessões abrindo a mesma página ao mesmo tempo e
+    quantas requisições chegam de fato ao backend
+  - login: vazão de verificações bcrypt pelo ServicoSenhas
+  - app: execução headless do app.py com o AppTest do Streamlit (se instalado)
+  - inicialização: imports e primeira renderização do login (inicializacao.py)
+
+Os resultados vão para um JSON (benchmarks/resultados/<data>-<commit>.json
+por padrão). Com --comparar, cada tempo é comparado ao de um resultado
+anterior e o script termina com código 1 se algum piorar além do limiar.
+
+Uso: python benchmarks/executar.py [--tamanhos 1000 10000 ...] [--saida arquivo.json]
+                                   [--comparar anterior.json] [--limiar 0.2]
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+import inicializacao  # noqa: E402
+import metricas  # noqa: E402
+from autenticacao import CUSTO_BCRYPT, ServicoOcupado, ServicoSenhas  # noqa: E402
+from catalogo import CacheCatalogo  # noqa: E402
+from cliente_api import ClienteAPI  # noqa: E402
+from dados import gerar_livros  # noqa: E402
+from exportacao import exportar, formatos_disponiveis  # noqa: E402
+from indice_busca import IndiceBusca  # noqa: E402
+from servidor_local import ServidorLocal  # noqa: E402
+
+TAMANHOS = [1000, 10000, 100000]
+REPETICOES = 5
+LIMIAR_REGRESSAO = 0.20
+# Tempos abaixo disso variam mais com ruído do que com o código
+TEMPO_MINIMO_COMPARACAO = 0.005
+LOGINS = 32
+SESSOES_SIMULTANEAS = 50
+TAMANHO_PAGINA = 50
+
+
+def cronometrar(funcao, repeticoes=REPETICOES):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return {'mediana_s': statistics.median(tempos), 'min_s': min(tempos)}
+
+
+def medir_listagem(cliente, tamanho):
+    cenarios = {
+        'sem_filtros': {},
+        'genero_categoria': {'generos': ['Romance', 'Fantasia'], 'categorias': ['E-book']},
+        'busca_servidor': {'busca': 'guerra'},
+        'ultima_pagina': {'offset': max(0, tamanho - TAMANHO_PAGINA)},
+    }
+    resultados = {}
+    for nome, filtros in cenarios.items():
+        # Cache novo a cada repetição: requisição completa ao backend
+        resultados[f'{nome}_frio'] = cronometrar(
+            lambda: CacheCatalogo(cliente).listar_pagina(limite=TAMANHO_PAGINA, **filtros))
+        # Intervalo zero: toda leitura revalida com If-None-Match (304)
+        catalogo = CacheCatalogo(cliente, intervalo_revalidacao=0)
+        catalogo.listar_pagina(limite=TAMANHO_PAGINA, **filtros)
+        resultados[f'{nome}_revalidado'] = cronometrar(
+            lambda: catalogo.listar_pagina(limite=TAMANHO_PAGINA, **filtros))
+
+    catalogo = CacheCatalogo(cliente)
+    _, df = catalogo.obter_indice()
+    resultados['indice_construcao'] = cronometrar(lambda: IndiceBusca.do_dataframe(df), repeticoes=1)
+    for consulta in ('guerra', 'sil', 'guerra mar'):
+        resultados[f'sugestoes_indice {consulta}'] = cronometrar(
+            lambda: catalogo.sugerir(consulta))
+    return resultados
+
+
+def medir_dashboard(cliente, servidor):
+    resultados = {}
+    catalogo = CacheCatalogo(cliente)
+    resultados['carga_completa'] = cronometrar(lambda: catalogo.obter_agregados(), repeticoes=1)
+    resultados['agregados_em_cache'] = cronometrar(lambda: catalogo.obter_agregados())
+    resultados['total_servidor'] = cronometrar(
+        lambda: CacheCatalogo(cliente).listar_pagina(limite=0))
+
+    sementes = itertools.count(1000)
+
+    def escrever_e_sincronizar():
+        servidor.semear(gerar_livros(10, semente=next(sementes)))
+        catalogo.invalidar()
+        catalogo.obter_agregados()
+    resultados['sincronizacao_delta_10'] = cronometrar(escrever_e_sincronizar)
+
+    # Edição pelo app: PUT + atualização local do snapshot, sem recarga completa
+    edicao = {'titulo': "Livro editado", 'autor': "Autor Editado", 'genero': "Outro", 'categoria': "E-book"}
+    ids = itertools.count(1)
+    resultados['edicao_otimista'] = cronometrar(
+        lambda: (catalogo.atualizar_livro(next(ids), edicao), catalogo.obter_agregados()))
+    resultados['snapshot'] = {
+        'cargas_completas': catalogo.snapshot.cargas_completas,
+        'sincronizacoes_delta': catalogo.snapshot.sincronizacoes_delta,
+        'escritas_locais': catalogo.snapshot.escritas_locais,
+    }
+    return resultados
+
+
+def medir_concorrencia(cliente, sessoes=SESSOES_SIMULTANEAS):
+    """Pico da manhã: `sessoes` sessões abrem a mesma página juntas, logo
+    depois de uma escrita ter vencido o cache compartilhado do processo."""
+    catalogo = CacheCatalogo(cliente)
+    catalogo.listar_pagina(limite=TAMANHO_PAGINA)
+    catalogo.invalidar()
+    barreira = threading.Barrier(sessoes)
+
+    def abrir_pagina(_):
+        barreira.wait()
+        return catalogo.listar_pagina(limite=TAMANHO_PAGINA)
+
+    antes = cliente.coalescencia()
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessoes) as executor:
+        list(executor.map(abrir_pagina, range(sessoes)))
+    duracao = time.perf_counter() - inicio
+    depois = cliente.coalescencia()
+    return {
+        'sessoes': sessoes,
+        'duracao_s': duracao,
+        'requisicoes_backend': depois['emitidas'] - antes['emitidas'],
+        'coalescidas_cache': catalogo.estatisticas()['coalescidas'],
+    }
+
+
+def medir_exportacao(cliente):
+    resultados = {}
+    for formato in formatos_disponiveis():
+        inicio = time.perf_counter()
+        arquivo, linhas = exportar(cliente, formato)
+        duracao = time.perf_counter() - inicio
+        with arquivo:
+            arquivo.seek(0, os.SEEK_END)
+            tamanho = arquivo.tell()
+        resultados[formato] = {
+            'duracao_s': duracao,
+            'linhas': linhas,
+            'bytes': tamanho,
+            'bytes_por_livro': round(tamanho / linhas, 2) if linhas else 0,
+        }
+    return resultados
+
+
+def medir_login(custo, logins=LOGINS):
+    servico = ServicoSenhas(custo=custo)
+    try:
+        hash_senha = servico.gerar_hash("senha-benchmark")
+
+        def tentar(_):
+            try:
+                return servico.verificar("senha-benchmark", hash_senha)
+            except ServicoOcupado:
+                return None
+
+        # Todas as tentativas de uma vez: mede também as recusas por fila cheia
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=logins) as executor:
+            respostas = list(executor.map(tentar, range(logins)))
+        duracao = time.perf_counter() - inicio
+        recusados = respostas.count(None)
+        return {
+            'custo_bcrypt': custo,
+            'logins': logins,
+            'recusados_ocupado': recusados,
+            'duracao_s': duracao,
+            'logins_por_segundo': round((logins - recusados) / duracao, 2),
+        }
+    finally:
+        servico.encerrar()
+
+
+def medir_app(servidor):
+    try:
+        import streamlit as st
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return {'ignorado': "streamlit não instalado"}
+
+    # Os recursos do app (cliente, catálogo) ficam em cache no processo;
+    # limpa para que apontem para o backend deste tamanho
+    st.cache_resource.clear()
+
+    os.environ['BIBLIOTECA_API_URL'] = servidor.url
+    diretorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as diretorio:
+        # usuarios.db é criado no diretório atual; mantém o do projeto intacto
+        os.chdir(diretorio)
+        try:
+            app = AppTest.from_file(str(RAIZ / "app.py"), default_timeout=600)
+            resultados = {'primeira_execucao': cronometrar(app.run, repeticoes=1)}
+
+            app.text_input[0].input("admin")
+            app.text_input[1].input("admin123")
+            entrar = next(botao for botao in app.button if botao.label == "Entrar")
+            resultados['login'] = cronometrar(lambda: entrar.click().run(), repeticoes=1)
+
+            menu = app.sidebar.radio[0]
+            resultados['pagina_listar'] = cronometrar(
+                lambda: menu.set_value("📖 Listar Livros").run(), repeticoes=1)
+            resultados['pagina_listar_busca'] = cronometrar(
+                lambda: app.text_input[0].input("guerra").run(), repeticoes=1)
+            resultados['pagina_dashboard'] = cronometrar(
+                lambda: app.sidebar.radio[0].set_value("📊 Dashboard").run(), repeticoes=1)
+            resultados['excecoes'] = [str(erro.value) for erro in app.exception]
+            return resultados
+        finally:
+            os.chdir(diretorio_original)
+
+
+def metadados():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "desconhecido"
+    return {
+        'commit': commit,
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def executar(tamanhos, custo_bcrypt, com_app=True):
+    resultado = {'metadados': metadados(), 'tamanhos': {}}
+    for tamanho in tamanhos:
+        print(f"\n== {tamanho} livros ==", flush=True)
+        inicio = time.perf_counter()
+        with ServidorLocal(tamanho) as servidor:
+            print(f"backend local pronto em {time.perf_counter() - inicio:.1f}s ({servidor.url})")
+            cliente = ClienteAPI(servidor.url, timeout=(3.05, 600))
+            try:
+                medidas = {}
+                for nome, funcao in (
+                    ('listagem', lambda: medir_listagem(cliente, tamanho)),
+                    ('dashboard', lambda: medir_dashboard(cliente, servidor)),
+                    ('exportacao', lambda: medir_exportacao(cliente)),
+                    ('concorrencia', lambda: medir_concorrencia(cliente)),
+                    ('app', lambda: medir_app(servidor) if com_app else {'ignorado': "--sem-app"}),
+                ):
+                    inicio = time.perf_counter()
+                    medidas[nome] = funcao()
+                    print(f"  {nome}: {time.perf_counter() - inicio:.1f}s", flush=True)
+                medidas['http'] = cliente.estatisticas()
+                medidas['http_coalescencia'] = cliente.coalescencia()
+            finally:
+                cliente.fechar()
+        resultado['tamanhos'][str(tamanho)] = medidas
+
+    # bcrypt não depende do tamanho do catálogo
+    resultado['login'] = medir_login(custo_bcrypt)
+    print(f"\nlogin: {resultado['login']['logins_por_segundo']} logins/s (custo {custo_bcrypt})")
+    resultado['inicializacao'] = inicializacao.medir(repeticoes=3)
+    login = resultado['inicializacao']['login_primeira_renderizacao']
+    if 'mediana_s' in login:
+        print(f"primeira renderização do login: {login['mediana_s'] * 1000:.0f}ms")
+    resultado['metricas'] = metricas.REGISTRO.exportar_json()
+    return resultado
+
+
+def _tempos(dados, prefixo=""):
+    # Achata o resultado em {caminho: segundos}, usando a mediana quando houver
+    if not isinstance(dados, dict):
+        return {}
+    if 'mediana_s' in dados:
+        return {prefixo: dados['mediana_s']}
+    tempos = {}
+    for chave, valor in dados.items():
+        caminho = f"{prefixo}/{chave}" if prefixo else chave
+        if chave == 'duracao_s' and isinstance(valor, (int, float)):
+            tempos[prefixo] = valor
+        elif chave not in ('metadados', 'metricas', 'http'):
+            tempos.update(_tempos(valor, caminho))
+    return tempos
+
+
+def comparar(atual, anterior, limiar=LIMIAR_REGRESSAO):
+    """Devolve [(caminho, antes_s, depois_s, variacao)] dos tempos que
+    pioraram mais que `limiar` (fração)."""
+    tempos_atuais = _tempos(atual)
+    regressoes = []
+    for caminho, antes in _tempos(anterior).items():
+        depois = tempos_atuais.get(caminho)
+        if depois is None or max(antes, depois) < TEMPO_MINIMO_COMPARACAO:
+            continue
+        variacao = (depois - antes) / antes if antes else float('inf')
+        if variacao > limiar:
+            regressoes.append((caminho, antes, depois, variacao))
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS)
+    parser.add_argument('--saida', type=Path)
+    parser.add_argument('--comparar', type=Path, help="resultado anterior (JSON)")
+    parser.add_argument('--limiar', type=float, default=LIMIAR_REGRESSAO)
+    parser.add_argument('--custo-bcrypt', type=int, default=CUSTO_BCRYPT)
+    parser.add_argument('--sem-app', action='store_true', help="não executa o AppTest")
+    args = parser.parse_args()
+
+    resultado = executar(args.tamanhos, args.custo_bcrypt, com_app=not args.sem_app)
+
+    saida = args.saida or (
+        Path(__file__).resolve().parent / "resultados"
+        / f"{datetime.now():%Y%m%d-%H%M%S}-{resultado['metadados']['commit']}.json"
+    )
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f"\nResultados gravados em {saida}")
+
+    if args.comparar:
+        anterior = json.loads(args.comparar.read_text(encoding='utf-8'))
+        regressoes = comparar(resultado, anterior, args.limiar)
+        print(f"\nComparação com {args.comparar} "
+              f"(commit {anterior.get('metadados', {}).get('commit', '?')}):")
+        if not regressoes:
+            print(f"  nenhuma regressão acima de {args.limiar:.0%}")
+        for caminho, antes, depois, variacao in regressoes:
+            print(f"  REGRESSÃO {caminho}: {antes * 1000:.1f}ms -> {depois * 1000:.1f}ms (+{variacao:.0%})")
+        if regressoes:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Tempo de partida a frio: imports e primeira renderização da tela de login.
+
+Cada medição roda em um processo Python novo, como em um pod recém-criado.
+Além dos tempos, lista quais dependências pesadas (pandas, requests, ...)
+o app carregou só para desenhar o login; o esperado é nenhuma.
+
+Uso: python benchmarks/inicializacao.py [repeticoes]   (padrão: 5)
+"""
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+REPETICOES = 5
+DEPENDENCIAS = ['streamlit', 'bcrypt', 'requests', 'pandas', 'xlsxwriter', 'pyarrow']
+MODULOS_APP = ['recursos', 'pagina_livros', 'pagina_importacao', 'pagina_dashboard']
+PESADOS = {'pandas', 'numpy', 'requests', 'urllib3', 'xlsxwriter', 'pyarrow'}
+
+_SCRIPT_IMPORT = """
+import sys, time
+inicio = time.perf_counter()
+__import__(sys.argv[1])
+print(time.perf_counter() - inicio)
+"""
+
+_SCRIPT_LOGIN = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+antes = set(sys.modules)
+inicio = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+duracao = time.perf_counter() - inicio
+carregados = {m.split('.')[0] for m in set(sys.modules) - antes}
+print(json.dumps({
+    'duracao_s': duracao,
+    'pesados_carregados': sorted(carregados & set(sys.argv[2].split(','))),
+    'excecoes': [str(e.value) for e in app.exception],
+}))
+"""
+
+
+def _python(script, *args, cwd=RAIZ):
+    ambiente = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        filter(None, [str(RAIZ), os.environ.get('PYTHONPATH')])))
+    saida = subprocess.run(
+        [sys.executable, "-c", script, *args], cwd=cwd, env=ambiente,
+        capture_output=True, text=True, check=True,
+    )
+    return saida.stdout.strip().splitlines()[-1]
+
+
+def tempo_import(modulo, repeticoes=REPETICOES):
+    tempos = [float(_python(_SCRIPT_IMPORT, modulo)) for _ in range(repeticoes)]
+    return {'mediana_s': statistics.median(tempos), 'min_s': min(tempos)}
+
+
+def primeira_renderizacao(repeticoes=REPETICOES):
+    tempos, pesados, excecoes = [], set(), []
+    for _ in range(repeticoes):
+        # Diretório vazio: nada de usuarios.db nem cache de execuções anteriores
+        with tempfile.TemporaryDirectory() as diretorio:
+            resultado = json.loads(_python(
+                _SCRIPT_LOGIN, str(RAIZ / "app.py"), ",".join(sorted(PESADOS)), cwd=diretorio))
+        tempos.append(resultado['duracao_s'])
+        pesados.update(resultado['pesados_carregados'])
+        excecoes += resultado['excecoes']
+    return {
+        'mediana_s': statistics.median(tempos),
+        'min_s': min(tempos),
+        'pesados_carregados': sorted(pesados),
+        'excecoes': excecoes,
+    }
+
+
+def medir(repeticoes=REPETICOES):
+    resultados = {'imports': {}}
+    for modulo in DEPENDENCIAS + MODULOS_APP:
+        if importlib.util.find_spec(modulo) is None:
+            resultados['imports'][modulo] = {'ignorado': "não instalado"}
+            continue
+        try:
+            resultados['imports'][modulo] = tempo_import(modulo, repeticoes)
+        except subprocess.CalledProcessError as e:
+            resultados['imports'][modulo] = {'erro': e.stderr.strip().splitlines()[-1]}
+
+    if importlib.util.find_spec('streamlit') is None:
+        resultados['login_primeira_renderizacao'] = {'ignorado': "streamlit não instalado"}
+    else:
+        resultados['login_primeira_renderizacao'] = primeira_renderizacao(repeticoes)
+    return resultados
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else REPETICOES
+    resultados = medir(repeticoes)
+    print(f"{'import':<24}{'mediana (ms)':>14}")
+    for modulo, medida in resultados['imports'].items():
+        valor = f"{medida['mediana_s'] * 1000:.1f}" if 'mediana_s' in medida else next(iter(medida.values()))
+        print(f"{modulo:<24}{valor:>14}")
+    login = resultados['login_primeira_renderizacao']
+    if 'mediana_s' in login:
+        print(f"\nlogin (1ª renderização): {login['mediana_s'] * 1000:.0f}ms; "
+              f"pesados carregados: {', '.join(login['pesados_carregados']) or 'nenhum'}")
+        for excecao in login['excecoes']:
+            print(f"  exceção: {excecao}")
+    else:
+        print(f"\nlogin: {login['ignorado']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Memória por livro do snapshot: DataFrame original (colunas object) x
+catálogo compacto.
+
+Mede com tracemalloc a memória que continua alocada depois de converter a
+resposta JSON da API no snapshot completo (o JSON bruto é descartado):
+DataFrame, agregados do dashboard e índice de busca, cada parte somada
+sobre as anteriores. Assim strings e categorias compartilhadas são contadas
+uma vez só. Também mostra o `memory_usage(deep=True)` do pandas, que conta
+cada célula do DataFrame separadamente.
+
+Uso: python benchmarks/memoria.py [tamanhos...]   (padrão: 1000000)
+"""
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agregados import AgregadosCatalogo  # noqa: E402
+from catalogo import COLUNAS, _indexar, livros_para_dataframe  # noqa: E402
+from dados import gerar_livros  # noqa: E402
+from indice_busca import IndiceBusca  # noqa: E402
+
+
+def gerar_json(n, semente=42):
+    return json.dumps(gerar_livros(n, semente))
+
+
+def original(livros):
+    df = pd.DataFrame(livros)
+    df.columns = COLUNAS
+    return df
+
+
+def _alocado():
+    # Colunas de texto do pandas 3 ficam em buffers do Arrow, fora do tracemalloc
+    arrow = pyarrow.total_allocated_bytes() if pyarrow is not None else 0
+    return tracemalloc.get_traced_memory()[0] + arrow
+
+
+def medir(construir, payload):
+    """Bytes retidos por parte do snapshot, na ordem em que o app as monta."""
+    gc.collect()
+    tracemalloc.start()
+    inicial = _alocado()
+    partes = {}
+
+    def marcar(parte):
+        gc.collect()
+        partes[parte] = _alocado() - inicial - sum(partes.values())
+
+    livros = json.loads(payload)  # cada linha com strings próprias, como no requests
+    df = _indexar(construir(livros))
+    del livros
+    marcar('dataframe')
+    agregados = AgregadosCatalogo.do_dataframe(df)
+    marcar('agregados')
+    indice = IndiceBusca.do_dataframe(df)
+    marcar('indice')
+    tracemalloc.stop()
+    return (df, agregados, indice), partes
+
+
+def executar(tamanhos):
+    resultados = []
+    for n in tamanhos:
+        payload = gerar_json(n)
+        for nome, construir in [('original', original), ('compacto', livros_para_dataframe)]:
+            snapshot, partes = medir(construir, payload)
+            retido = sum(partes.values())
+            resultados.append({
+                'livros': n,
+                'modelo': nome,
+                'bytes_por_livro': round(retido / n, 1),
+                **{f'{parte}_mb': round(valor / 1024 / 1024, 1) for parte, valor in partes.items()},
+                'total_mb': round(retido / 1024 / 1024, 1),
+                'pandas_deep_mb': round(snapshot[0].memory_usage(deep=True).sum() / 1024 / 1024, 1),
+            })
+            del snapshot
+    return resultados
+
+
+if __name__ == "__main__":
+    tamanhos = [int(t) for t in sys.argv[1:]] or [1_000_000]
+    print(pd.DataFrame(executar(tamanhos)).to_string(index=False))
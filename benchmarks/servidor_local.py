@@ -0,0 +1,456 @@
+"""Substituto local da API Go (tutorial.go) para benchmarks.
+
+Implementa as mesmas rotas e semânticas sobre SQLite: filtros (com os
+mesmos índices e a busca FTS5), paginação
+por limite/offset e por cursor (apos), ETag/304, X-Catalogo-Seq,
+X-Total-Count/X-Total-Acervo, log de alterações e o fluxo SSE de
+/livros/eventos, lote e CRUD. Roda em
+uma thread do próprio processo, em uma porta livre.
+
+Uso avulso: python benchmarks/servidor_local.py [livros] [porta]
+"""
+import itertools
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dados import gerar_livros  # noqa: E402
+
+TAMANHO_MAXIMO_LOTE = 5000
+LIMITE_MAXIMO_PAGINA = 1000
+CONSULTA_SEQ = "SELECT COALESCE(MAX(seq), 0) FROM livros_alteracoes"
+INTERVALO_KEEP_ALIVE = 15
+_ROTA_ID = re.compile(r'^/livros/(\d+)$')
+_PALAVRA = re.compile(r'[^\W_]+')
+
+_ESQUEMA = """
+    CREATE TABLE IF NOT EXISTS livros (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        titulo TEXT NOT NULL,
+        autor TEXT NOT NULL,
+        genero TEXT,
+        categoria TEXT
+    );
+    CREATE TABLE IF NOT EXISTS livros_alteracoes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        livro_id INTEGER NOT NULL,
+        operacao TEXT NOT NULL,
+        momento TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_livros_autor ON livros(autor);
+    CREATE INDEX IF NOT EXISTS idx_livros_genero ON livros(genero);
+    CREATE INDEX IF NOT EXISTS idx_livros_categoria ON livros(categoria);
+    CREATE VIRTUAL TABLE IF NOT EXISTS livros_fts USING fts5(
+        titulo, autor,
+        content='livros', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    );
+"""
+
+_TRIGGERS = """
+    CREATE TRIGGER IF NOT EXISTS livros_ai AFTER INSERT ON livros BEGIN
+        INSERT INTO livros_alteracoes (livro_id, operacao) VALUES (NEW.id, 'I');
+    END;
+    CREATE TRIGGER IF NOT EXISTS livros_au AFTER UPDATE ON livros BEGIN
+        INSERT INTO livros_alteracoes (livro_id, operacao) VALUES (NEW.id, 'U');
+    END;
+    CREATE TRIGGER IF NOT EXISTS livros_ad AFTER DELETE ON livros BEGIN
+        INSERT INTO livros_alteracoes (livro_id, operacao) VALUES (OLD.id, 'D');
+    END;
+    CREATE TRIGGER IF NOT EXISTS livros_fts_ai AFTER INSERT ON livros BEGIN
+        INSERT INTO livros_fts (rowid, titulo, autor) VALUES (NEW.id, NEW.titulo, NEW.autor);
+    END;
+    CREATE TRIGGER IF NOT EXISTS livros_fts_ad AFTER DELETE ON livros BEGIN
+        INSERT INTO livros_fts (livros_fts, rowid, titulo, autor) VALUES ('delete', OLD.id, OLD.titulo, OLD.autor);
+    END;
+    CREATE TRIGGER IF NOT EXISTS livros_fts_au AFTER UPDATE ON livros BEGIN
+        INSERT INTO livros_fts (livros_fts, rowid, titulo, autor) VALUES ('delete', OLD.id, OLD.titulo, OLD.autor);
+        INSERT INTO livros_fts (rowid, titulo, autor) VALUES (NEW.id, NEW.titulo, NEW.autor);
+    END;
+"""
+
+
+class ErroRequisicao(Exception):
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def _escapar_like(texto):
+    return texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _consulta_textual(busca):
+    # Mesma conversão do backend: cada palavra vira um prefixo obrigatório
+    return " ".join(f'"{palavra}"*' for palavra in _PALAVRA.findall(busca))
+
+
+def _livro(linha):
+    return dict(zip(('id', 'titulo', 'autor', 'genero', 'categoria'), linha))
+
+
+class ServidorLocal:
+    """Banco SQLite (em memória por padrão) + servidor HTTP da API de livros.
+
+    Os livros iniciais são gravados antes dos triggers, então o log de
+    alterações começa vazio, como em um banco recém-migrado.
+    """
+
+    def __init__(self, livros=0, caminho=':memory:', host='127.0.0.1', porta=0, semente=42):
+        self.host = host
+        self.porta = porta
+        self._lock = threading.Lock()
+        self._inicio = format(time.time_ns(), 'x')
+        self._versao = 0
+        self._aviso = threading.Condition()
+        self._parando = threading.Event()
+        self._servidor = None
+        # Espera entre gravar e responder uma escrita: simula a resposta
+        # perdida depois do commit (timeout no cliente)
+        self.atraso_escrita = 0
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.executescript(_ESQUEMA)
+        if livros:
+            self.semear(gerar_livros(livros, semente))
+        self._conn.executescript(_TRIGGERS)
+        self._conn.execute("INSERT INTO livros_fts (livros_fts) VALUES ('rebuild')")
+        self._conn.commit()
+
+    def semear(self, livros):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO livros (titulo, autor, genero, categoria) VALUES (?, ?, ?, ?)",
+                [(l['titulo'], l['autor'], l['genero'], l['categoria']) for l in livros]
+            )
+            self._registrar_escrita()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.porta}"
+
+    def etag(self):
+        return f'W/"{self._inicio}-{self._versao}"'
+
+    def _registrar_escrita(self):
+        with self._aviso:
+            self._versao += 1
+            self._aviso.notify_all()
+
+    # Rotas -----------------------------------------------------------------
+
+    def _filtros(self, query):
+        condicoes, args = [], []
+        busca = query.get('busca', [''])[0].strip()
+        consulta = _consulta_textual(busca)
+        if consulta:
+            condicoes.append("id IN (SELECT rowid FROM livros_fts WHERE livros_fts MATCH ?)")
+            args.append(consulta)
+        elif busca:
+            padrao = f"%{_escapar_like(busca)}%"
+            condicoes.append("(titulo LIKE ? ESCAPE '\\' OR autor LIKE ? ESCAPE '\\')")
+            args += [padrao, padrao]
+        for coluna in ('genero', 'categoria'):
+            valores = query.get(coluna)
+            if valores:
+                condicoes.append(f"{coluna} IN ({', '.join('?' * len(valores))})")
+                args += valores
+        return (" WHERE " + " AND ".join(condicoes)) if condicoes else "", args
+
+    def listar(self, query, if_none_match):
+        etag = self.etag()
+        if if_none_match == etag:
+            return 304, None, {}
+        cabecalhos = {'ETag': etag}
+        where, args = self._filtros(query)
+        paginacao = ""
+        with self._lock:
+            cabecalhos['X-Catalogo-Seq'] = str(self._conn.execute(CONSULTA_SEQ).fetchone()[0])
+            if 'limite' in query:
+                try:
+                    limite = int(query['limite'][0])
+                except ValueError:
+                    limite = -1
+                if not 0 <= limite <= LIMITE_MAXIMO_PAGINA:
+                    raise ErroRequisicao(400, "Parâmetro limite inválido")
+                if 'apos' in query:
+                    try:
+                        apos = int(query['apos'][0])
+                    except ValueError:
+                        raise ErroRequisicao(400, "Parâmetro apos inválido")
+                    where += (" AND" if where else " WHERE") + " id > ?"
+                    args = args + [apos]
+                    paginacao = " LIMIT ?"
+                    args.append(limite)
+                else:
+                    try:
+                        offset = int(query.get('offset', ['0'])[0])
+                    except ValueError:
+                        offset = -1
+                    if offset < 0:
+                        raise ErroRequisicao(400, "Parâmetro offset inválido")
+                    cabecalhos['X-Total-Count'] = str(
+                        self._conn.execute("SELECT COUNT(*) FROM livros" + where, args).fetchone()[0])
+                    cabecalhos['X-Total-Acervo'] = str(
+                        self._conn.execute("SELECT COUNT(*) FROM livros").fetchone()[0])
+                    paginacao = " LIMIT ? OFFSET ?"
+                    args = args + [limite, offset]
+            linhas = self._conn.execute(
+                "SELECT id, titulo, autor, genero, categoria FROM livros" + where + " ORDER BY id" + paginacao,
+                args
+            ).fetchall()
+        return 200, [_livro(linha) for linha in linhas], cabecalhos
+
+    def alteracoes(self, query):
+        try:
+            desde = int(query.get('desde', ['0'])[0])
+        except ValueError:
+            desde = -1
+        if desde < 0:
+            raise ErroRequisicao(400, "Parâmetro desde inválido")
+        return 200, self._ler_alteracoes(desde), {}
+
+    def _ler_alteracoes(self, desde):
+        with self._lock:
+            seq = self._conn.execute(CONSULTA_SEQ).fetchone()[0]
+            linhas = self._conn.execute("""
+                SELECT a.livro_id, l.id, l.titulo, l.autor, l.genero, l.categoria
+                FROM (SELECT DISTINCT livro_id FROM livros_alteracoes WHERE seq > ?) a
+                LEFT JOIN livros l ON l.id = a.livro_id
+                ORDER BY a.livro_id""", (desde,)).fetchall()
+        return {
+            'seq': seq,
+            'alterados': [_livro(linha[1:]) for linha in linhas if linha[1] is not None],
+            'excluidos': [linha[0] for linha in linhas if linha[1] is None],
+        }
+
+    def eventos(self, inicio=None):
+        """Fluxo SSE de /livros/eventos: gera os blocos de texto a enviar,
+        um evento "alteracoes" por escrita (com a seq como id) e
+        comentários de keep-alive, até o servidor parar."""
+        if inicio is None:
+            with self._lock:
+                desde = self._conn.execute(CONSULTA_SEQ).fetchone()[0]
+        else:
+            try:
+                desde = int(inicio)
+            except ValueError:
+                desde = -1
+            if desde < 0:
+                raise ErroRequisicao(400, "Parâmetro desde inválido")
+        yield f"retry: 3000\n: seq {desde}\n\n"
+        while not self._parando.is_set():
+            # Versão lida antes das alterações: uma escrita no meio não se perde
+            versao = self._versao
+            alteracoes = self._ler_alteracoes(desde)
+            if alteracoes['seq'] != desde:
+                dados = json.dumps(alteracoes, ensure_ascii=False)
+                yield f"id: {alteracoes['seq']}\nevent: alteracoes\ndata: {dados}\n\n"
+                desde = alteracoes['seq']
+            with self._aviso:
+                acordou = self._aviso.wait_for(
+                    lambda: self._versao != versao or self._parando.is_set(), INTERVALO_KEEP_ALIVE)
+            if not acordou:
+                yield ": keep-alive\n\n"
+
+    def buscar(self, id_livro):
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT id, titulo, autor, genero, categoria FROM livros WHERE id = ?", (id_livro,)
+            ).fetchone()
+        if linha is None:
+            return 404, {'erro': "Livro não encontrado"}, {}
+        return 200, _livro(linha), {}
+
+    def criar(self, livro):
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO livros (titulo, autor, genero, categoria) VALUES (?, ?, ?, ?)",
+                (livro.get('titulo', ''), livro.get('autor', ''), livro.get('genero', ''),
+                 livro.get('categoria', ''))
+            )
+            self._registrar_escrita()
+        return 201, {**livro, 'id': cursor.lastrowid}, {}
+
+    def criar_lote(self, livros):
+        if not isinstance(livros, list):
+            raise ErroRequisicao(400, "Corpo deve ser uma lista de livros")
+        if len(livros) > TAMANHO_MAXIMO_LOTE:
+            raise ErroRequisicao(413, f"Lote maior que {TAMANHO_MAXIMO_LOTE} livros")
+        resultado = {'criados': [], 'erros': []}
+        with self._lock, self._conn:
+            for indice, livro in enumerate(livros):
+                if not str(livro.get('titulo', '')).strip() or not str(livro.get('autor', '')).strip():
+                    resultado['erros'].append({'indice': indice, 'erro': "Título e autor são obrigatórios"})
+                    continue
+                cursor = self._conn.execute(
+                    "INSERT INTO livros (titulo, autor, genero, categoria) VALUES (?, ?, ?, ?)",
+                    (livro['titulo'], livro['autor'], livro.get('genero', ''), livro.get('categoria', ''))
+                )
+                resultado['criados'].append({**livro, 'id': cursor.lastrowid})
+            if resultado['criados']:
+                self._registrar_escrita()
+        return 200, resultado, {}
+
+    def atualizar(self, id_livro, livro):
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE livros SET titulo = ?, autor = ?, genero = ?, categoria = ? WHERE id = ?",
+                (livro.get('titulo', ''), livro.get('autor', ''), livro.get('genero', ''),
+                 livro.get('categoria', ''), id_livro)
+            )
+            if cursor.rowcount == 0:
+                return 404, {'erro': "Livro não encontrado"}, {}
+            self._registrar_escrita()
+        return 200, livro, {}
+
+    def excluir(self, id_livro):
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM livros WHERE id = ?", (id_livro,))
+            if cursor.rowcount == 0:
+                return 404, {'erro': "Livro não encontrado"}, {}
+            self._registrar_escrita()
+        return 204, None, {}
+
+    def despachar(self, metodo, caminho, query, corpo, if_none_match=None):
+        rota_id = _ROTA_ID.match(caminho)
+        if metodo == 'GET' and caminho == '/livros':
+            return self.listar(query, if_none_match)
+        if metodo == 'GET' and caminho == '/livros/alteracoes':
+            return self.alteracoes(query)
+        if metodo == 'POST' and caminho == '/livros':
+            return self.criar(corpo or {})
+        if metodo == 'POST' and caminho == '/livros/lote':
+            return self.criar_lote(corpo)
+        if rota_id:
+            id_livro = int(rota_id.group(1))
+            if metodo == 'GET':
+                return self.buscar(id_livro)
+            if metodo == 'PUT':
+                return self.atualizar(id_livro, corpo or {})
+            if metodo == 'DELETE':
+                return self.excluir(id_livro)
+        return 404, {'erro': "Rota não encontrada"}, {}
+
+    # Servidor HTTP ---------------------------------------------------------
+
+    def iniciar(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _transmitir(self, query):
+                inicio = self.headers.get('Last-Event-ID') or query.get('desde', [None])[0]
+                try:
+                    fluxo = api.eventos(inicio)
+                    primeiro = next(fluxo)
+                except ErroRequisicao as e:
+                    conteudo = json.dumps({'erro': str(e)}, ensure_ascii=False).encode('utf-8')
+                    self.send_response(e.status)
+                    self.send_header('Content-Type', 'application/json; charset=utf-8')
+                    self.send_header('Content-Length', str(len(conteudo)))
+                    self.end_headers()
+                    self.wfile.write(conteudo)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                # Chunked, como o Gin: o cliente recebe cada evento assim que é enviado
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                self.close_connection = True
+                try:
+                    for bloco in itertools.chain([primeiro], fluxo):
+                        conteudo = bloco.encode('utf-8')
+                        self.wfile.write(b'%x\r\n%s\r\n' % (len(conteudo), conteudo))
+                        self.wfile.flush()
+                    self.wfile.write(b'0\r\n\r\n')
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # cliente desconectou
+                finally:
+                    fluxo.close()
+
+            def _responder(self, metodo):
+                partes = urlsplit(self.path)
+                if metodo == 'GET' and partes.path == '/livros/eventos':
+                    return self._transmitir(parse_qs(partes.query))
+                tamanho = int(self.headers.get('Content-Length') or 0)
+                try:
+                    corpo = json.loads(self.rfile.read(tamanho)) if tamanho else None
+                    status, dados, cabecalhos = api.despachar(
+                        metodo, partes.path, parse_qs(partes.query, keep_blank_values=True),
+                        corpo, self.headers.get('If-None-Match'))
+                except ErroRequisicao as e:
+                    status, dados, cabecalhos = e.status, {'erro': str(e)}, {}
+                except (ValueError, AttributeError) as e:
+                    status, dados, cabecalhos = 400, {'erro': str(e)}, {}
+                if metodo != 'GET' and api.atraso_escrita:
+                    time.sleep(api.atraso_escrita)
+
+                conteudo = b'' if dados is None else json.dumps(dados, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                for nome, valor in cabecalhos.items():
+                    self.send_header(nome, valor)
+                if conteudo:
+                    self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(conteudo)))
+                self.end_headers()
+                self.wfile.write(conteudo)
+
+            def do_GET(self):
+                self._responder('GET')
+
+            def do_POST(self):
+                self._responder('POST')
+
+            def do_PUT(self):
+                self._responder('PUT')
+
+            def do_DELETE(self):
+                self._responder('DELETE')
+
+            def log_message(self, *args):
+                pass
+
+        self._servidor = ThreadingHTTPServer((self.host, self.porta), Handler)
+        self._servidor.daemon_threads = True
+        self.porta = self._servidor.server_address[1]
+        threading.Thread(target=self._servidor.serve_forever, daemon=True,
+                         name='servidor-local').start()
+        return self
+
+    def parar(self):
+        self._parando.set()
+        with self._aviso:
+            self._aviso.notify_all()
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+        self._conn.close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+
+if __name__ == "__main__":
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    porta = int(sys.argv[2]) if len(sys.argv) > 2 else 8080
+    with ServidorLocal(quantidade, porta=porta) as servidor:
+        print(f"API local com {quantidade} livros em {servidor.url} (Ctrl+C para sair)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
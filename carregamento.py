@@ -0,0 +1,36 @@
+import asyncio
+
+LIMITE_CONCORRENCIA = 4
+
+
+async def _executar(nome, funcao, semaforo, timeout):
+    async with semaforo:
+        try:
+            if asyncio.iscoroutinefunction(funcao):
+                chamada = funcao()
+            else:
+                # Funções síncronas (requests, pandas) rodam no executor padrão
+                chamada = asyncio.to_thread(funcao)
+            return nome, await asyncio.wait_for(chamada, timeout), None
+        except Exception as e:
+            return nome, None, e
+
+
+async def carregar(tarefas, ao_concluir, limite=LIMITE_CONCORRENCIA, timeout=None):
+    semaforo = asyncio.Semaphore(limite)
+    pendentes = [_executar(nome, funcao, semaforo, timeout) for nome, funcao in tarefas.items()]
+    for proximo in asyncio.as_completed(pendentes):
+        nome, resultado, erro = await proximo
+        ao_concluir(nome, resultado, erro)
+
+
+def carregar_em_paralelo(tarefas, ao_concluir, limite=LIMITE_CONCORRENCIA, timeout=None):
+    """Executa as tarefas ({nome: função}) concorrentemente, no máximo
+    `limite` por vez, e chama `ao_concluir(nome, resultado, erro)` na
+    thread atual à medida que cada uma termina.
+
+    O tempo total fica próximo ao da tarefa mais lenta, não à soma delas.
+    `ao_concluir` roda na thread que chamou esta função, então pode
+    desenhar elementos do Streamlit.
+    """
+    asyncio.run(carregar(tarefas, ao_concluir, limite, timeout))
@@ -0,0 +1,832 @@
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import metricas
+from agregados import AgregadosCatalogo
+from estado_compartilhado import gravar_json, ler_json
+from indice_busca import IndiceBusca
+from voo_unico import VooUnico
+
+COLUNAS_API = ['id', 'titulo', 'autor', 'genero', 'categoria']
+COLUNAS = ['ID', 'Título', 'Autor', 'Gênero', 'Categoria']
+GENEROS = ["Romance", "Ficção Científica", "Fantasia",
+           "Técnico", "Biografia", "História",
+           "Autoajuda", "Infantil", "Outro"]
+CATEGORIAS = ["Livro Físico", "E-book", "Audiobook",
+              "Revista", "Artigo", "Outro"]
+COLUNAS_CATEGORICAS = ['Autor', 'Gênero', 'Categoria']
+
+# Intervalo mínimo entre revalidações condicionais de uma mesma entrada
+INTERVALO_REVALIDACAO = 2.0
+MAX_ENTRADAS = 256
+# Por quanto tempo as respostas ficam no estado compartilhado; depois de
+# INTERVALO_REVALIDACAO elas ainda servem para revalidar pelo ETag
+TTL_COMPARTILHADO = 3600
+# Espera máxima entre tentativas do atualizador com o backend fora do ar
+ESPERA_MAXIMA_ATUALIZACAO = 60
+# Com o fluxo de eventos conectado, o atualizador só confere o snapshot
+# de tempos em tempos, como rede de segurança
+INTERVALO_COM_EVENTOS = 300
+WORKERS_REVALIDACAO = 4
+# Versões do snapshot cujos IDs alterados ficam guardados para o índice de
+# busca se atualizar por delta; atrás disso, ele é reconstruído
+HISTORICO_ALTERACOES = 256
+_CHAVE_INVALIDADO = 'catalogo:invalidado_em'
+_CHAVE_AGREGADOS = 'catalogo:agregados'
+
+
+@metricas.cronometrado('dataframe_construcao')
+def livros_para_dataframe(livros):
+    df = pd.DataFrame(livros or [], columns=COLUNAS_API)
+    df.columns = COLUNAS
+    return compactar(df)
+
+
+def compactar(df):
+    """Representação enxuta do catálogo: IDs em int32 e autor, gênero e
+    categoria como categóricos (códigos inteiros), para que livros do mesmo
+    autor compartilhem uma única cópia do nome."""
+    df['ID'] = df['ID'].astype('int32')
+    for coluna in COLUNAS_CATEGORICAS:
+        df[coluna] = df[coluna].astype('category')
+    return df
+
+
+def _alinhar_categorias(base, novos):
+    # Concatenar categóricos com categorias diferentes viraria object
+    for coluna in COLUNAS_CATEGORICAS:
+        faltantes = novos[coluna].cat.categories.difference(base[coluna].cat.categories)
+        if len(faltantes):
+            base[coluna] = base[coluna].cat.add_categories(faltantes)
+        novos[coluna] = novos[coluna].cat.set_categories(base[coluna].cat.categories)
+
+
+def _indexar(df):
+    df.index = df['ID'].to_numpy()
+    return df
+
+
+def aplicar_delta(df, alterados, excluidos):
+    """Novo DataFrame com o delta aplicado; o original continua válido
+    para as sessões que ainda o estão lendo."""
+    if not alterados and not excluidos:
+        return df
+    # Uma única cópia: livros existentes são sobrescritos no lugar e só os
+    # novos são concatenados (reordenando apenas se ficarem fora de ordem)
+    atualizado = df.drop(index=list(excluidos), errors='ignore') if excluidos else df.copy()
+    if alterados:
+        novos = _indexar(livros_para_dataframe(alterados))
+        novos = novos[~novos.index.duplicated(keep='last')]
+        _alinhar_categorias(atualizado, novos)
+        existentes = novos.index.isin(atualizado.index)
+        if existentes.any():
+            atualizado.loc[novos.index[existentes]] = novos[existentes]
+        if not existentes.all():
+            atualizado = pd.concat([atualizado, novos[~existentes]])
+            if not atualizado.index.is_monotonic_increasing:
+                atualizado = atualizado.sort_index()
+    return atualizado
+
+
+class SnapshotCatalogo:
+    """Cópia local do catálogo completo mantida por sincronização incremental.
+
+    A primeira carga usa GET /livros e guarda a seq do log de alterações
+    (cabeçalho X-Catalogo-Seq); as seguintes pedem apenas o que mudou em
+    GET /livros/alteracoes?desde=<seq>.
+
+    Com `iniciar_atualizacao`, uma thread mantém o snapshot em dia e as
+    leituras devolvem o snapshot atual sem esperar pelo backend; se ele
+    cair, continua valendo o último snapshot bom.
+    """
+
+    def __init__(self, cliente, intervalo_revalidacao=INTERVALO_REVALIDACAO):
+        self.cliente = cliente
+        self.intervalo_revalidacao = intervalo_revalidacao
+        self.seq = None
+        self.sincronizado_em = float('-inf')
+        self.atualizado_em = None
+        self.ultimo_erro = None
+        self.falhas_consecutivas = 0
+        self._atualizador = None
+        self._intervalo_atualizacao = None
+        self.ao_vivo = False
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._df = None
+        self.agregados = None
+        self.versao = 0
+        self._alteracoes = deque(maxlen=HISTORICO_ALTERACOES)
+        self._lock = threading.Lock()
+        self._lock_busca = threading.Lock()
+        self.cargas_completas = 0
+        self.sincronizacoes_delta = 0
+        self.linhas_delta = 0
+        self.escritas_locais = 0
+        self._lock_reconciliacao = threading.Lock()
+        self._reconciliando = False
+        self._reconciliacao_pendente = False
+
+    def sincronizar(self, forcar=False):
+        if not forcar and self._atualizador is not None and self._df is not None:
+            # Stale-while-revalidate: quem atualiza é a thread do atualizador
+            return
+        # Uma busca por vez. O lock do snapshot só é tomado para ler a seq e
+        # para trocar os dados, nunca durante a requisição: escritas locais,
+        # eventos e leitores não esperam pelo backend
+        with self._lock_busca:
+            agora = time.monotonic()
+            with self._lock:
+                if (not forcar and self._df is not None
+                        and agora - self.sincronizado_em < self.intervalo_revalidacao):
+                    return
+                df, seq = self._df, self.seq
+            try:
+                if df is None or seq is None:
+                    self._carregar_completo()
+                else:
+                    self._sincronizar_delta(df, seq)
+            except Exception as e:
+                self.ultimo_erro = str(e)
+                self.falhas_consecutivas += 1
+                metricas.contar('snapshot_erro')
+                if self._df is None:
+                    raise
+                # Backend fora do ar: continua servindo o último snapshot bom
+                return
+            self.sincronizado_em = agora
+            self.atualizado_em = time.monotonic()
+            self.ultimo_erro = None
+            self.falhas_consecutivas = 0
+            if self._atualizador is None and self._intervalo_atualizacao is not None:
+                self.iniciar_atualizacao(self._intervalo_atualizacao)
+
+    def idade(self):
+        """Segundos desde a última sincronização bem-sucedida (None se
+        o catálogo ainda não foi carregado)."""
+        if self.atualizado_em is None:
+            return None
+        return time.monotonic() - self.atualizado_em
+
+    def iniciar_atualizacao(self, intervalo=None, sob_demanda=False):
+        """Carrega o catálogo já, em segundo plano, e o sincroniza a cada
+        `intervalo` segundos, antes que alguma leitura precise. Com
+        `sob_demanda`, a thread só começa depois que uma leitura carregar
+        o catálogo pela primeira vez."""
+        if self._atualizador is not None:
+            return
+        self._intervalo_atualizacao = intervalo or self.intervalo_revalidacao
+        if sob_demanda and self._df is None:
+            return
+        self._atualizador = threading.Thread(
+            target=self._atualizar, args=(self._intervalo_atualizacao,),
+            daemon=True, name='atualizador-catalogo',
+        )
+        self._atualizador.start()
+
+    def parar_atualizacao(self):
+        self._parar.set()
+        self._acordar.set()
+
+    def _atualizar(self, intervalo):
+        while not self._parar.is_set():
+            try:
+                self.sincronizar(forcar=True)
+            except Exception:
+                pass  # já registrado em ultimo_erro; tenta de novo depois
+            espera = INTERVALO_COM_EVENTOS if self.ao_vivo else intervalo
+            if self.falhas_consecutivas:
+                espera = min(intervalo * 2 ** self.falhas_consecutivas, ESPERA_MAXIMA_ATUALIZACAO)
+            self._acordar.wait(espera)
+            self._acordar.clear()
+
+    def dataframe(self):
+        self.sincronizar()
+        return self._df
+
+    def _carregar_completo(self):
+        seq_antes = self.seq
+        response = self.cliente.get("/livros")
+        response.raise_for_status()
+        seq = response.headers.get('X-Catalogo-Seq')
+        seq = int(seq) if seq is not None else None
+        df = _indexar(livros_para_dataframe(response.json()))
+        agregados = AgregadosCatalogo.do_dataframe(df)
+        with self._lock:
+            if (self.seq != seq_antes and self.seq is not None
+                    and seq is not None and self.seq > seq):
+                # Um evento trouxe dados mais novos durante a carga
+                return
+            self._df, self.agregados, self.seq = df, agregados, seq
+            self.versao += 1
+            self._alteracoes.clear()
+        self.cargas_completas += 1
+        metricas.contar('snapshot_carga_completa')
+
+    def _sincronizar_delta(self, df, seq):
+        response = self.cliente.get("/livros/alteracoes", params={'desde': seq})
+        if response.status_code == 404:
+            return self._carregar_completo()
+        response.raise_for_status()
+        delta = response.json()
+        if delta['seq'] < seq:
+            # Log reiniciado (banco recriado): a seq local não vale mais
+            return self._carregar_completo()
+        # O DataFrame novo é montado fora do lock, sobre o que estava em uso
+        novo_df = aplicar_delta(df, delta['alterados'], delta['excluidos'])
+        with self._lock:
+            if self.seq is None:
+                return  # recarga completa pedida durante a busca
+            if self.seq != seq and delta['seq'] <= self.seq:
+                return  # um evento aplicado durante a busca já trouxe este delta
+            # Escrita local ou evento no meio da busca: refaz sobre o atual
+            self._aplicar_delta(delta, novo_df if self._df is df else None)
+        metricas.contar('snapshot_sincronizacao_delta')
+
+    def _aplicar_delta(self, delta, novo_df=None):
+        # Chamado com self._lock
+        if novo_df is None:
+            novo_df = aplicar_delta(self._df, delta['alterados'], delta['excluidos'])
+        ids = [livro['id'] for livro in delta['alterados']] + list(delta['excluidos'])
+        self.agregados.aplicar(self._df, novo_df, ids)
+        self._df = novo_df
+        self._registrar_alteracao(ids)
+        self.seq = delta['seq']
+        self.sincronizacoes_delta += 1
+        self.linhas_delta += len(delta['alterados']) + len(delta['excluidos'])
+
+    def _registrar_alteracao(self, ids):
+        # Chamado com self._lock, a cada troca do DataFrame por delta
+        self.versao += 1
+        self._alteracoes.append((self.versao, ids))
+
+    def alteracoes_desde(self, versao):
+        """(DataFrame, versão atual, IDs alterados desde `versao`). Os IDs
+        vêm como None se o histórico não cobre o intervalo (carga completa
+        no meio, ou alterações antigas demais)."""
+        with self._lock:
+            if versao is None:
+                return self._df, self.versao, None
+            alteracoes = [ids for v, ids in self._alteracoes if v > versao]
+            if len(alteracoes) != self.versao - versao:
+                return self._df, self.versao, None
+            return self._df, self.versao, set().union(*alteracoes)
+
+    def aplicar_evento(self, delta, desde):
+        """Aplica um delta recebido pelo fluxo de eventos, calculado a
+        partir da seq `desde`. Se ele não encaixa na seq local (lacuna ou
+        log reiniciado), pede uma sincronização em vez de aplicá-lo."""
+        with self._lock:
+            if self._df is None or self.seq is None:
+                return False
+            if delta['seq'] <= self.seq and (desde is None or delta['seq'] >= desde):
+                return False  # já refletido (ex.: reconciliação depois de uma escrita local)
+            if desde is None or desde > self.seq or delta['seq'] < desde:
+                metricas.contar('snapshot_evento_fora_de_ordem')
+                self.invalidar()
+                return False
+            self._aplicar_delta(delta)
+            self.sincronizado_em = self.atualizado_em = time.monotonic()
+            metricas.contar('snapshot_evento_aplicado')
+            return True
+
+    def invalidar(self):
+        self.sincronizado_em = float('-inf')
+        self._acordar.set()
+
+    def recarregar(self):
+        """Descarta a seq: a próxima sincronização baixa o catálogo inteiro
+        (o snapshot atual continua servindo até lá)."""
+        with self._lock:
+            self.seq = None
+        self.invalidar()
+
+    def aplicar_local(self, alterados=(), excluidos=()):
+        """Aplica ao snapshot uma escrita feita por este processo, sem
+        esperar a próxima sincronização. Devolve o delta inverso
+        (anteriores, novos) para `desfazer`, ou None se não há snapshot."""
+        with self._lock:
+            if self._df is None:
+                return None
+            ids = [livro['id'] for livro in alterados] + list(excluidos)
+            existentes = self._df.loc[self._df.index.intersection(ids)]
+            anteriores = existentes.rename(columns=dict(zip(COLUNAS, COLUNAS_API))).to_dict('records')
+            novos = [id_livro for id_livro in ids if id_livro not in self._df.index]
+            novo_df = aplicar_delta(self._df, alterados, excluidos)
+            self.agregados.aplicar(self._df, novo_df, ids)
+            self._df = novo_df
+            self._registrar_alteracao(ids)
+            self.escritas_locais += 1
+            metricas.contar('snapshot_escrita_local')
+            return anteriores, novos
+
+    def desfazer(self, inverso):
+        if inverso is None:
+            return
+        anteriores, novos = inverso
+        self.aplicar_local(anteriores, novos)
+        metricas.contar('snapshot_escrita_local_desfeita')
+
+    def reconciliar_em_segundo_plano(self):
+        """Sincroniza com o backend em uma thread, fora da requisição do
+        usuário. Pedidos feitos durante uma reconciliação viram um só."""
+        with self._lock_reconciliacao:
+            self._reconciliacao_pendente = True
+            if self._reconciliando:
+                return
+            self._reconciliando = True
+        threading.Thread(target=self._reconciliar, daemon=True, name='reconciliacao-catalogo').start()
+
+    def _reconciliar(self):
+        while True:
+            with self._lock_reconciliacao:
+                if not self._reconciliacao_pendente:
+                    self._reconciliando = False
+                    return
+                self._reconciliacao_pendente = False
+            try:
+                self.sincronizar(forcar=True)
+            except Exception:
+                metricas.contar('snapshot_reconciliacao_erro')
+
+
+class _Entrada:
+    __slots__ = ('etag', 'dados', 'cabecalhos', 'verificado_em')
+
+    def __init__(self, etag, dados, cabecalhos):
+        self.etag = etag
+        self.dados = dados
+        self.cabecalhos = cabecalhos
+        self.verificado_em = time.monotonic()
+
+
+class CacheCatalogo:
+    """Cache do catálogo compartilhado por todas as sessões do processo.
+
+    Cada resposta de GET é guardada junto com o ETag do backend. Depois de
+    `INTERVALO_REVALIDACAO` segundos (ou de uma escrita local) a entrada é
+    revalidada com If-None-Match; um 304 reaproveita os dados já
+    convertidos. Sessões que pedem a mesma chave enquanto ela é buscada
+    esperam por essa busca e recebem a mesma entrada já convertida
+    (VooUnico), em vez de disparar requisições próprias.
+
+    Com um `estado` compartilhado (ver estado_compartilhado.py), as
+    respostas e os agregados também são publicados nele: uma réplica
+    aproveita o que outra já buscou, e uma escrita invalida todas.
+
+    Com um `leitor` (LeitorBancoLocal), os agregados do dashboard vêm
+    direto do biblioteca.db, quando o app roda junto do backend.
+    """
+
+    def __init__(self, cliente, intervalo_revalidacao=INTERVALO_REVALIDACAO,
+                 max_entradas=MAX_ENTRADAS, estado=None, leitor=None):
+        self.cliente = cliente
+        self.estado = estado
+        self.leitor = leitor
+        self.intervalo_revalidacao = intervalo_revalidacao
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self._voo = VooUnico('cache_catalogo')
+        self.snapshot = SnapshotCatalogo(cliente, intervalo_revalidacao)
+        self._executor = None
+        self._revalidando = set()
+        self._assinatura = None
+        self._indice = None
+        self._indice_versao = None
+        self._lock_indice = threading.Lock()
+        self._reconstruindo_indice = False
+        self.acertos = 0
+        self.acertos_compartilhados = 0
+        self.revalidacoes = 0
+        self.buscas = 0
+
+    @staticmethod
+    def _chave(caminho, params):
+        itens = []
+        for nome, valor in sorted((params or {}).items()):
+            if isinstance(valor, (list, tuple)):
+                valor = tuple(valor)
+            itens.append((nome, valor))
+        return caminho, tuple(itens)
+
+    def _guardar(self, chave, entrada):
+        with self._lock:
+            self._entradas[chave] = entrada
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def _compartilhado_valido(self, verificado_em):
+        # Entradas de outras réplicas valem até o intervalo de revalidação,
+        # desde que nenhuma escrita tenha invalidado o catálogo depois
+        invalidado_em = ler_json(self.estado, _CHAVE_INVALIDADO) or 0
+        return (time.time() - verificado_em < self.intervalo_revalidacao
+                and verificado_em > invalidado_em)
+
+    def _ler_compartilhada(self, chave):
+        chave_estado = 'catalogo:' + json.dumps(chave, ensure_ascii=False)
+        try:
+            publicada = ler_json(self.estado, chave_estado)
+            if publicada is None:
+                return None, False
+            entrada = _Entrada(publicada['etag'], publicada['dados'], publicada['cabecalhos'])
+            return entrada, self._compartilhado_valido(publicada['verificado_em'])
+        except Exception:
+            # Estado compartilhado indisponível: segue só com o cache local
+            metricas.contar('estado_compartilhado_erro')
+            return None, False
+
+    def _publicar(self, chave, entrada):
+        chave_estado = 'catalogo:' + json.dumps(chave, ensure_ascii=False)
+        try:
+            gravar_json(self.estado, chave_estado, {
+                'etag': entrada.etag,
+                'dados': entrada.dados,
+                # Nomes canônicos: a leitura é feita com dict comum, sensível a caixa
+                'cabecalhos': {nome.title(): valor for nome, valor in entrada.cabecalhos.items()},
+                'verificado_em': time.time(),
+            }, ex=TTL_COMPARTILHADO)
+        except Exception:
+            metricas.contar('estado_compartilhado_erro')
+
+    def _obter_entrada(self, caminho, params=None):
+        chave = self._chave(caminho, params)
+        if self._executor is not None:
+            with self._lock:
+                entrada = self._entradas.get(chave)
+            # Vencida só pelo tempo (não por uma escrita): devolve já e
+            # revalida em segundo plano (stale-while-revalidate)
+            if (entrada and entrada.verificado_em != float('-inf')
+                    and time.monotonic() - entrada.verificado_em >= self.intervalo_revalidacao):
+                metricas.contar('cache_catalogo_obsoleto_servido')
+                self._agendar_revalidacao(chave, caminho, params)
+                return entrada
+        return self._revalidar(chave, caminho, params)
+
+    def _agendar_revalidacao(self, chave, caminho, params):
+        with self._lock:
+            if chave in self._revalidando:
+                return
+            self._revalidando.add(chave)
+
+        def revalidar():
+            try:
+                self._revalidar(chave, caminho, params)
+            except Exception:
+                metricas.contar('cache_catalogo_revalidacao_erro')
+            finally:
+                with self._lock:
+                    self._revalidando.discard(chave)
+
+        self._executor.submit(revalidar)
+
+    def _revalidar(self, chave, caminho, params):
+        entrada = self._entrada_valida(chave)
+        if entrada is not None:
+            return entrada
+        return self._voo.executar(chave, lambda: self._buscar(chave, caminho, params))
+
+    def _entrada_valida(self, chave):
+        with self._lock:
+            entrada = self._entradas.get(chave)
+        if entrada and time.monotonic() - entrada.verificado_em < self.intervalo_revalidacao:
+            self.acertos += 1
+            metricas.contar('cache_catalogo_acerto')
+            return entrada
+        return None
+
+    def _buscar(self, chave, caminho, params):
+        # Confere de novo: outra busca pela mesma chave pode ter acabado agora
+        entrada = self._entrada_valida(chave)
+        if entrada is not None:
+            return entrada
+        with self._lock:
+            entrada = self._entradas.get(chave)
+        agora = time.monotonic()
+
+        if self.estado is not None:
+            compartilhada, valida = self._ler_compartilhada(chave)
+            if valida:
+                self.acertos_compartilhados += 1
+                metricas.contar('cache_catalogo_acerto_compartilhado')
+                self._guardar(chave, compartilhada)
+                return compartilhada
+            # Mesmo vencida, o ETag dela permite revalidar sem baixar tudo
+            if compartilhada and (entrada is None or entrada.etag != compartilhada.etag):
+                entrada = compartilhada
+
+        cabecalhos = {'If-None-Match': entrada.etag} if entrada and entrada.etag else {}
+        try:
+            response = self.cliente.get(caminho, params=params, headers=cabecalhos)
+            if response.status_code != 304:
+                response.raise_for_status()
+        except Exception:
+            if entrada is None:
+                raise
+            # Backend fora do ar: a última resposta boa vale mais que um erro
+            metricas.contar('cache_catalogo_erro_servido_obsoleto')
+            return entrada
+        if response.status_code == 304 and entrada:
+            self.revalidacoes += 1
+            metricas.contar('cache_catalogo_revalidacao_304')
+            entrada.verificado_em = agora
+            self._guardar(chave, entrada)
+            if self.estado is not None:
+                self._publicar(chave, entrada)
+            return entrada
+
+        self.buscas += 1
+        metricas.contar('cache_catalogo_falta')
+        entrada = _Entrada(response.headers.get('ETag'), response.json(), response.headers)
+        self._guardar(chave, entrada)
+        if self.estado is not None:
+            self._publicar(chave, entrada)
+        return entrada
+
+    def iniciar_eventos(self):
+        """Assina o fluxo de alterações do backend: cada escrita, de
+        qualquer réplica ou cliente, chega como delta e é aplicada ao
+        snapshot e aos agregados, sem polling. Se o backend não oferece o
+        fluxo, segue o atualizador periódico de `iniciar_atualizacao`."""
+        if self._assinatura is None:
+            from eventos_catalogo import AssinaturaAlteracoes
+            self._assinatura = AssinaturaAlteracoes(
+                self.cliente, self.aplicar_evento,
+                seq_inicial=lambda: self.snapshot.seq,
+                ao_mudar_conexao=self._ao_mudar_conexao,
+            ).iniciar()
+        return self._assinatura
+
+    def _ao_mudar_conexao(self, conectado):
+        self.snapshot.ao_vivo = conectado
+        if not conectado:
+            # Eventos podem ter se perdido até a reconexão: sincroniza já
+            self.snapshot.invalidar()
+
+    def aplicar_evento(self, delta, desde):
+        # Sem snapshot carregado (ex.: com leitor local), o evento ainda vence
+        # as páginas em cache
+        if self.snapshot.aplicar_evento(delta, desde) or self.snapshot.idade() is None:
+            # Páginas e buscas do servidor revalidam pelo ETag na próxima leitura;
+            # quem escreveu já invalidou o estado compartilhado
+            self._marcar_vencidas(compartilhado=False)
+
+    def iniciar_atualizacao(self):
+        """Passa a atualizar o catálogo em segundo plano: o snapshot é
+        carregado já e mantido em dia por uma thread, e respostas vencidas
+        são devolvidas na hora enquanto revalidam. Com leitor local, o
+        snapshot só é baixado quando alguma leitura precisar dele."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=WORKERS_REVALIDACAO, thread_name_prefix='revalidacao-catalogo')
+        self.snapshot.iniciar_atualizacao(sob_demanda=self.leitor is not None)
+
+    def situacao(self):
+        return {
+            'idade_s': self.snapshot.idade(),
+            'erro': self.snapshot.ultimo_erro,
+            'falhas_consecutivas': self.snapshot.falhas_consecutivas,
+        }
+
+    def obter(self, caminho, params=None):
+        entrada = self._obter_entrada(caminho, params)
+        return entrada.dados, entrada.cabecalhos
+
+    def obter_dataframe(self):
+        """Catálogo completo como DataFrame (somente leitura)."""
+        return self.snapshot.dataframe()
+
+    def obter_agregados(self):
+        """Resumo do dashboard, mantido por delta junto com o snapshot.
+
+        Com estado compartilhado, um resumo recente publicado por outra
+        réplica é usado sem carregar o catálogo neste processo."""
+        if self.leitor is not None:
+            try:
+                return self.leitor.agregados()
+            except Exception:
+                # Banco local inacessível: segue pelo caminho da API
+                metricas.contar('leitor_local_erro')
+
+        if self.estado is not None:
+            try:
+                publicado = ler_json(self.estado, _CHAVE_AGREGADOS)
+                if publicado and self._compartilhado_valido(publicado['verificado_em']):
+                    self.acertos_compartilhados += 1
+                    metricas.contar('agregados_acerto_compartilhado')
+                    return publicado['resumo']
+            except Exception:
+                metricas.contar('estado_compartilhado_erro')
+
+        self.snapshot.sincronizar()
+        resumo = self.snapshot.agregados.resumo()
+        if self.estado is not None:
+            try:
+                gravar_json(self.estado, _CHAVE_AGREGADOS,
+                            {'resumo': resumo, 'verificado_em': time.time()}, ex=TTL_COMPARTILHADO)
+            except Exception:
+                metricas.contar('estado_compartilhado_erro')
+        return resumo
+
+    def obter_indice(self):
+        """Índice de busca e o DataFrame atual do snapshot, como par.
+
+        Só a primeira construção é feita na hora. Depois, o índice segue o
+        snapshot pelos IDs alterados em cada versão; uma carga completa, ou
+        alterações acumuladas demais, levam a uma reconstrução em uma
+        thread, e as buscas seguem no índice anterior até ela terminar."""
+        self.obter_dataframe()
+        with self._lock_indice:
+            df, versao, ids = self.snapshot.alteracoes_desde(self._indice_versao)
+            if self._indice is None:
+                with metricas.medir('indice_busca_construcao'):
+                    self._indice = IndiceBusca.do_dataframe(df)
+                self._indice_versao = versao
+            elif ids is None:
+                self._reconstruir_indice_em_segundo_plano()
+            elif ids:
+                with metricas.medir('indice_busca_atualizacao'):
+                    self._indice = self._indice.atualizado(df, ids)
+                self._indice_versao = versao
+                if self._indice.precisa_reconstruir:
+                    self._reconstruir_indice_em_segundo_plano()
+            return self._indice, df
+
+    def _reconstruir_indice_em_segundo_plano(self):
+        # Chamado com self._lock_indice
+        if not self._reconstruindo_indice:
+            self._reconstruindo_indice = True
+            threading.Thread(target=self._reconstruir_indice, daemon=True, name='indice-busca').start()
+
+    def _reconstruir_indice(self):
+        # O que mudar durante a construção entra depois por delta, a partir
+        # da versão em que o índice novo foi montado
+        try:
+            df, versao, _ = self.snapshot.alteracoes_desde(None)
+            with metricas.medir('indice_busca_construcao'):
+                indice = IndiceBusca.do_dataframe(df)
+            with self._lock_indice:
+                self._indice, self._indice_versao = indice, versao
+        except Exception:
+            metricas.contar('indice_busca_erro')
+        finally:
+            with self._lock_indice:
+                self._reconstruindo_indice = False
+
+    def sugerir(self, texto, limite=20):
+        """Até `limite` opções (id, título, autor) para o seletor de livros:
+        o ID exato, se o texto for numérico, seguido dos melhores resultados
+        do índice de busca."""
+        indice, df = self.obter_indice()
+        ids = []
+        if texto.isdecimal() and int(texto) in df.index:
+            ids.append(int(texto))
+        for id_livro in indice.buscar(texto, limite):
+            # Durante uma reconstrução o índice pode estar atrás do snapshot
+            if id_livro not in ids and id_livro in df.index:
+                ids.append(id_livro)
+
+        selecionados = df.loc[ids[:limite]]
+        return list(zip(
+            selecionados['ID'].tolist(),
+            selecionados['Título'].tolist(),
+            selecionados['Autor'].tolist(),
+        ))
+
+    def obter_livro(self, id_livro):
+        """Livro atualizado direto do backend (sem cache), com as colunas
+        de exibição; None se não existir."""
+        response = self.cliente.get(f"/livros/{id_livro}")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        livro = response.json()
+        return dict(zip(COLUNAS, (livro[coluna] for coluna in COLUNAS_API)))
+
+    @metricas.cronometrado('listagem_pagina_servidor')
+    def listar_pagina(self, busca="", generos=(), categorias=(), limite=50, offset=0):
+        params = {'limite': limite, 'offset': offset}
+        if busca:
+            params['busca'] = busca
+        if generos:
+            params['genero'] = list(generos)
+        if categorias:
+            params['categoria'] = list(categorias)
+
+        livros, cabecalhos = self.obter("/livros", params)
+        livros = livros or []
+        total_filtrado = int(cabecalhos.get('X-Total-Count', len(livros)))
+        total_acervo = int(cabecalhos.get('X-Total-Acervo', total_filtrado))
+        return livros, total_filtrado, total_acervo
+
+    def criar_livro(self, livro):
+        response = self.cliente.post("/livros", json=livro)
+        response.raise_for_status()
+        criado = response.json()
+        self.snapshot.aplicar_local([criado])
+        self._apos_escrita()
+        return criado
+
+    def atualizar_livro(self, id_livro, livro):
+        """PUT otimista: o snapshot e os agregados mudam antes da resposta
+        e voltam ao estado anterior se a escrita falhar."""
+        alterado = {**livro, 'id': id_livro}
+        inverso = self.snapshot.aplicar_local([alterado])
+        try:
+            response = self.cliente.put(f"/livros/{id_livro}", json=livro)
+            response.raise_for_status()
+        except Exception as e:
+            self._desfazer_escrita(inverso, [id_livro], e)
+            raise
+        self._apos_escrita()
+        return alterado
+
+    def excluir_livro(self, id_livro):
+        inverso = self.snapshot.aplicar_local(excluidos=[id_livro])
+        try:
+            response = self.cliente.delete(f"/livros/{id_livro}")
+            response.raise_for_status()
+        except Exception as e:
+            self._desfazer_escrita(inverso, [id_livro], e)
+            raise
+        self._apos_escrita()
+
+    def _desfazer_escrita(self, inverso, ids, erro):
+        status = getattr(getattr(erro, 'response', None), 'status_code', None)
+        if status is not None and 400 <= status < 500:
+            # Recusa definitiva: a escrita não aconteceu no backend
+            self.snapshot.desfazer(inverso)
+            if status == 404:
+                # O livro já não existe no backend (excluído em outra sessão): a
+                # reconciliação o tira do snapshot, se ele ainda estiver lá
+                self._apos_escrita()
+            return
+
+        # Timeout, conexão caída ou 5xx: a escrita pode ter sido gravada (e já
+        # chegado por evento). Em vez de voltar ao valor anterior, aplica o
+        # que o backend tem agora para esses livros
+        metricas.contar('escrita_incerta')
+        self._marcar_vencidas()
+        if inverso is None:
+            return
+        try:
+            self.snapshot.aplicar_local(*self._estado_no_backend(ids))
+        except Exception:
+            # Backend inacessível: a próxima sincronização recarrega tudo
+            self.snapshot.recarregar()
+
+    def _estado_no_backend(self, ids):
+        """(alterados, excluidos) com o estado atual dos livros no backend."""
+        alterados, excluidos = [], []
+        for id_livro in ids:
+            response = self.cliente.get(f"/livros/{id_livro}")
+            if response.status_code == 404:
+                excluidos.append(id_livro)
+                continue
+            response.raise_for_status()
+            alterados.append(response.json())
+        return alterados, excluidos
+
+    def _apos_escrita(self):
+        # O snapshot já reflete a escrita: só as páginas do servidor e as
+        # outras réplicas precisam revalidar; o snapshot confere em segundo plano
+        self._marcar_vencidas()
+        self.snapshot.reconciliar_em_segundo_plano()
+
+    def _marcar_vencidas(self, compartilhado=True):
+        # Mantém os ETags: a próxima leitura revalida em vez de baixar tudo
+        with self._lock:
+            for entrada in self._entradas.values():
+                entrada.verificado_em = float('-inf')
+        if compartilhado and self.estado is not None:
+            try:
+                gravar_json(self.estado, _CHAVE_INVALIDADO, time.time())
+            except Exception:
+                metricas.contar('estado_compartilhado_erro')
+
+    def invalidar(self):
+        # Mantém também a seq: a próxima leitura do snapshot é incremental
+        self._marcar_vencidas()
+        self.snapshot.invalidar()
+
+    def estatisticas(self):
+        return {
+            'entradas': len(self._entradas),
+            'acertos': self.acertos,
+            'acertos_compartilhados': self.acertos_compartilhados,
+            'revalidacoes': self.revalidacoes,
+            'buscas': self.buscas,
+            'cargas_completas': self.snapshot.cargas_completas,
+            'sincronizacoes_delta': self.snapshot.sincronizacoes_delta,
+            'linhas_delta': self.snapshot.linhas_delta,
+            'escritas_locais': self.snapshot.escritas_locais,
+            'coalescidas': self._voo.coalescidas,
+            'eventos_recebidos': self._assinatura.eventos if self._assinatura else 0,
+            'eventos_conectado': bool(self._assinatura and self._assinatura.conectado),
+        }
@@ -0,0 +1,120 @@
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metricas
+from voo_unico import VooUnico, congelar
+
+# Configurações padrão do cliente
+TIMEOUT_CONEXAO = 3.05
+TIMEOUT_LEITURA = 10
+TENTATIVAS = 3
+BACKOFF = 0.3
+TAMANHO_POOL = 20
+
+_ID_NA_ROTA = re.compile(r'/\d+(?=/|$)')
+
+
+class ClienteAPI:
+    """Cliente HTTP compartilhado para a API de livros.
+
+    Usa uma única `requests.Session` com pool de conexões keep-alive,
+    timeouts limitados e novas tentativas com backoff apenas para verbos
+    idempotentes. GETs idênticos feitos ao mesmo tempo (mesma rota,
+    parâmetros e cabeçalhos) viram uma única requisição, cuja resposta é
+    compartilhada. Também acumula contadores de latência por rota.
+    """
+
+    def __init__(self, base_url, timeout=(TIMEOUT_CONEXAO, TIMEOUT_LEITURA),
+                 tentativas=TENTATIVAS, backoff=BACKOFF, tamanho_pool=TAMANHO_POOL):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+        retry = Retry(
+            total=tentativas,
+            connect=tentativas,
+            read=tentativas,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=tamanho_pool,
+            pool_maxsize=tamanho_pool,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._lock = threading.Lock()
+        self._latencias = {}
+        self._voo = VooUnico('http_get')
+
+    def _registrar(self, rota, duracao, erro):
+        metricas.observar(f"http {rota}", duracao)
+        if erro:
+            metricas.contar(f"http_erro {rota}")
+        with self._lock:
+            estat = self._latencias.setdefault(rota, {
+                'requisicoes': 0,
+                'erros': 0,
+                'total_s': 0.0,
+                'max_s': 0.0,
+            })
+            estat['requisicoes'] += 1
+            estat['total_s'] += duracao
+            estat['max_s'] = max(estat['max_s'], duracao)
+            if erro:
+                estat['erros'] += 1
+
+    def requisitar(self, metodo, caminho, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        rota = f"{metodo} {_ID_NA_ROTA.sub('/{id}', caminho)}"
+        inicio = time.perf_counter()
+        try:
+            response = self.session.request(metodo, f"{self.base_url}{caminho}", **kwargs)
+        except requests.exceptions.RequestException:
+            self._registrar(rota, time.perf_counter() - inicio, erro=True)
+            raise
+        self._registrar(rota, time.perf_counter() - inicio, erro=response.status_code >= 500)
+        return response
+
+    def get(self, caminho, **kwargs):
+        if kwargs.get('stream'):
+            # Corpo lido aos poucos por quem chamou: não dá para compartilhar
+            return self.requisitar('GET', caminho, **kwargs)
+        chave = (caminho, congelar(kwargs))
+        return self._voo.executar(chave, lambda: self.requisitar('GET', caminho, **kwargs))
+
+    def post(self, caminho, **kwargs):
+        return self.requisitar('POST', caminho, **kwargs)
+
+    def put(self, caminho, **kwargs):
+        return self.requisitar('PUT', caminho, **kwargs)
+
+    def delete(self, caminho, **kwargs):
+        return self.requisitar('DELETE', caminho, **kwargs)
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                rota: dict(
+                    estat,
+                    media_ms=round(estat['total_s'] / estat['requisicoes'] * 1000, 2),
+                    max_ms=round(estat['max_s'] * 1000, 2),
+                )
+                for rota, estat in self._latencias.items()
+            }
+
+    def coalescencia(self):
+        """GETs enviados ao backend e GETs que aproveitaram um já em andamento."""
+        return self._voo.estatisticas()
+
+    def fechar(self):
+        self.session.close()
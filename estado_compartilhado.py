@@ -0,0 +1,231 @@
+import json
+import math
+import secrets
+import sqlite3
+import threading
+import time
+
+TTL_SESSAO = 8 * 3600
+# Depois de trocado, o token antigo ainda vale por alguns segundos, para
+# abas abertas ao mesmo tempo que restauram com o mesmo cookie
+TOLERANCIA_TROCA = 30
+# A cada quantas gravações o SQLite descarta as chaves expiradas
+LIMPEZA_A_CADA = 1000
+
+
+class EstadoMemoria:
+    """Estado chave/valor no próprio processo, com a mesma interface do
+    SQLite e do Redis (get/set/delete). Serve para uma réplica só e como
+    substituto local do Redis."""
+
+    def __init__(self):
+        self._dados = {}
+        self._lock = threading.Lock()
+
+    def get(self, chave):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                return None
+            valor, expira_em = item
+            if expira_em is not None and expira_em <= time.time():
+                del self._dados[chave]
+                return None
+            return valor
+
+    def set(self, chave, valor, ex=None):
+        if isinstance(valor, str):
+            valor = valor.encode()
+        with self._lock:
+            self._dados[chave] = (valor, time.time() + ex if ex else None)
+        return True
+
+    def delete(self, *chaves):
+        with self._lock:
+            return sum(self._dados.pop(chave, None) is not None for chave in chaves)
+
+    def incr(self, chave):
+        with self._lock:
+            valor, expira_em = self._dados.get(chave, (b'0', None))
+            if expira_em is not None and expira_em <= time.time():
+                valor, expira_em = b'0', None
+            novo = int(valor) + 1
+            self._dados[chave] = (str(novo).encode(), expira_em)
+            return novo
+
+    def expire(self, chave, segundos):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                return False
+            self._dados[chave] = (item[0], time.time() + segundos)
+            return True
+
+    def close(self):
+        pass
+
+
+class EstadoSQLite:
+    """Estado chave/valor com expiração em um arquivo SQLite.
+
+    Vários processos do mesmo host (ou com o arquivo em volume
+    compartilhado) enxergam os mesmos dados. Segue o subconjunto da API
+    do cliente Redis usado pelo app: get, set(ex=segundos), delete, incr
+    e expire.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._local = threading.local()
+        self._gravacoes = 0
+        with self._conexao() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS estado (
+                    chave TEXT PRIMARY KEY,
+                    valor BLOB NOT NULL,
+                    expira_em REAL
+                )
+            """)
+
+    def _conexao(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.caminho, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def get(self, chave):
+        linha = self._conexao().execute(
+            "SELECT valor FROM estado WHERE chave = ? AND (expira_em IS NULL OR expira_em > ?)",
+            (chave, time.time())
+        ).fetchone()
+        return linha[0] if linha else None
+
+    def set(self, chave, valor, ex=None):
+        if isinstance(valor, str):
+            valor = valor.encode()
+        with self._conexao() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO estado (chave, valor, expira_em) VALUES (?, ?, ?)",
+                (chave, valor, time.time() + ex if ex else None)
+            )
+        self._gravacoes += 1
+        if self._gravacoes % LIMPEZA_A_CADA == 0:
+            self.limpar_expirados()
+        return True
+
+    def delete(self, *chaves):
+        with self._conexao() as conn:
+            cursor = conn.executemany("DELETE FROM estado WHERE chave = ?", [(c,) for c in chaves])
+        return cursor.rowcount
+
+    def incr(self, chave):
+        agora = time.time()
+        # Uma transação só: réplicas incrementando juntas não perdem contagens
+        with self._conexao() as conn:
+            # Chave expirada recomeça do zero, como no Redis
+            conn.execute("DELETE FROM estado WHERE chave = ? AND expira_em <= ?", (chave, agora))
+            conn.execute("""
+                INSERT INTO estado (chave, valor, expira_em) VALUES (?, 1, NULL)
+                ON CONFLICT(chave) DO UPDATE SET valor = CAST(valor AS INTEGER) + 1
+            """, (chave,))
+            return conn.execute("SELECT valor FROM estado WHERE chave = ?", (chave,)).fetchone()[0]
+
+    def expire(self, chave, segundos):
+        with self._conexao() as conn:
+            cursor = conn.execute(
+                "UPDATE estado SET expira_em = ? WHERE chave = ?", (time.time() + segundos, chave))
+        return cursor.rowcount > 0
+
+    def limpar_expirados(self):
+        with self._conexao() as conn:
+            conn.execute("DELETE FROM estado WHERE expira_em <= ?", (time.time(),))
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def conectar(url):
+    """Cria o estado a partir de uma URL: redis://... (requer o pacote
+    redis), sqlite:///caminho.db ou memoria://."""
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        import redis
+        return redis.Redis.from_url(url)
+    if url.startswith('memoria://'):
+        return EstadoMemoria()
+    if url.startswith('sqlite:///'):
+        return EstadoSQLite(url[len('sqlite:///'):])
+    raise ValueError(f"URL de estado não suportada: {url}")
+
+
+def ler_json(estado, chave):
+    valor = estado.get(chave)
+    return json.loads(valor) if valor is not None else None
+
+
+def gravar_json(estado, chave, objeto, ex=None):
+    estado.set(chave, json.dumps(objeto, ensure_ascii=False), ex=ex)
+
+
+class Sessoes:
+    """Sessões autenticadas no estado compartilhado, identificadas por um
+    token aleatório; qualquer réplica que receba o token restaura o login.
+
+    O prazo é contado a partir do login e não é estendido pelo uso. Cada
+    restauração troca o token por um novo (`trocar`), então um token
+    copiado deixa de valer logo depois do próximo uso legítimo.
+    """
+
+    PREFIXO = 'sessao:'
+
+    def __init__(self, estado, ttl=TTL_SESSAO):
+        self.estado = estado
+        self.ttl = ttl
+
+    def _gravar(self, token, sessao, validade=None):
+        restante = sessao['expira_em'] - time.time()
+        if validade is not None:
+            restante = min(restante, validade)
+        gravar_json(self.estado, self.PREFIXO + token, sessao, ex=max(1, math.ceil(restante)))
+
+    def criar(self, usuario):
+        """Abre uma sessão; devolve (token, expira_em)."""
+        token = secrets.token_urlsafe(32)
+        expira_em = time.time() + self.ttl
+        self._gravar(token, {'usuario': usuario, 'expira_em': expira_em})
+        return token, expira_em
+
+    def obter(self, token):
+        """Sessão ({'usuario', 'expira_em'}) ou None se expirada."""
+        sessao = ler_json(self.estado, self.PREFIXO + token)
+        # Sessões no formato antigo (sem prazo final) não são aceitas
+        if sessao is None or sessao.get('expira_em', 0) <= time.time():
+            return None
+        return sessao
+
+    def trocar(self, token):
+        """Emite um token novo para a sessão, com o mesmo prazo final, e
+        encurta o antigo para TOLERANCIA_TROCA segundos. Devolve
+        (token_novo, sessao) ou (None, None) se a sessão não existe mais."""
+        sessao = self.obter(token)
+        if sessao is None:
+            return None, None
+        novo = secrets.token_urlsafe(32)
+        # O antecessor fica registrado para o logout invalidá-lo também
+        self._gravar(novo, {'usuario': sessao['usuario'], 'expira_em': sessao['expira_em'], 'anterior': token})
+        if not sessao.get('trocado'):
+            # Só na primeira troca: usar o token antigo de novo não prolonga a tolerância
+            self._gravar(token, dict(sessao, trocado=True), validade=TOLERANCIA_TROCA)
+        return novo, sessao
+
+    def encerrar(self, token):
+        """Apaga a sessão e os tokens que ela substituiu, que ainda valeriam
+        por TOLERANCIA_TROCA e permitiriam restaurar o login logo após sair."""
+        while token:
+            sessao = ler_json(self.estado, self.PREFIXO + token)
+            self.estado.delete(self.PREFIXO + token)
+            token = sessao.get('anterior') if sessao else None
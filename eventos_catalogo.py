@@ -0,0 +1,113 @@
+import json
+import threading
+
+import metricas
+
+# O backend manda um keep-alive a cada 15s: sem nada por mais tempo que
+# isso, a conexão é dada como morta e refeita
+TIMEOUT_LEITURA_EVENTOS = 45
+TIMEOUT_CONEXAO_EVENTOS = 3.05
+ESPERA_RECONEXAO = 1.0
+ESPERA_MAXIMA_RECONEXAO = 60
+
+
+def ler_eventos(linhas):
+    """Interpreta um fluxo SSE linha a linha, gerando (id, evento, dados)
+    para cada evento completo. Comentários (keep-alive) são ignorados."""
+    id_evento, evento, dados = None, 'message', []
+    for linha in linhas:
+        if not linha:
+            if dados:
+                yield id_evento, evento, '\n'.join(dados)
+            id_evento, evento, dados = None, 'message', []
+            continue
+        if linha.startswith(':'):
+            continue
+        campo, _, valor = linha.partition(':')
+        valor = valor[1:] if valor.startswith(' ') else valor
+        if campo == 'id':
+            id_evento = valor
+        elif campo == 'event':
+            evento = valor
+        elif campo == 'data':
+            dados.append(valor)
+
+
+class AssinaturaAlteracoes:
+    """Assinatura do fluxo GET /livros/eventos do backend.
+
+    Uma thread mantém a conexão aberta e entrega cada delta recebido a
+    `ao_receber(delta, desde)`, em que `desde` é a seq a partir da qual o
+    delta foi calculado (None se desconhecida). Reconecta com backoff,
+    retomando pelo Last-Event-ID; `seq_inicial()` dá a seq de partida da
+    primeira conexão. `ao_mudar_conexao(conectado)` avisa quando o fluxo
+    cai ou volta, para quem depende dele retomar ou suspender o polling.
+    """
+
+    def __init__(self, cliente, ao_receber, seq_inicial=lambda: None,
+                 ao_mudar_conexao=lambda conectado: None):
+        self.cliente = cliente
+        self.ao_receber = ao_receber
+        self.seq_inicial = seq_inicial
+        self.ao_mudar_conexao = ao_mudar_conexao
+        self.ultimo_id = None
+        self.conectado = False
+        self.eventos = 0
+        self.reconexoes = 0
+        self._parar = threading.Event()
+        self._thread = None
+
+    def iniciar(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._executar, daemon=True, name='eventos-catalogo')
+            self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+
+    def _executar(self):
+        falhas = 0
+        while not self._parar.is_set():
+            try:
+                if not self._escutar():
+                    return
+                falhas = 0
+            except Exception:
+                falhas += 1
+                metricas.contar('eventos_catalogo_erro')
+            finally:
+                if self.conectado:
+                    self.conectado = False
+                    self.ao_mudar_conexao(False)
+            self.reconexoes += 1
+            self._parar.wait(min(ESPERA_RECONEXAO * 2 ** falhas, ESPERA_MAXIMA_RECONEXAO))
+
+    def _escutar(self):
+        """Uma conexão, até ela cair. Devolve False se o backend não
+        oferece o fluxo (a assinatura termina e o polling continua)."""
+        desde = self.ultimo_id if self.ultimo_id is not None else self.seq_inicial()
+        cabecalhos = {'Accept': 'text/event-stream'}
+        if desde is not None:
+            cabecalhos['Last-Event-ID'] = str(desde)
+        response = self.cliente.get("/livros/eventos", headers=cabecalhos, stream=True,
+                                    timeout=(TIMEOUT_CONEXAO_EVENTOS, TIMEOUT_LEITURA_EVENTOS))
+        with response:
+            if response.status_code == 404:
+                metricas.contar('eventos_catalogo_indisponivel')
+                return False
+            response.raise_for_status()
+            # SSE é sempre UTF-8, mesmo sem charset no Content-Type
+            response.encoding = 'utf-8'
+            self.conectado = True
+            self.ao_mudar_conexao(True)
+            for id_evento, evento, dados in ler_eventos(response.iter_lines(decode_unicode=True)):
+                if self._parar.is_set():
+                    break
+                if evento == 'alteracoes':
+                    self.eventos += 1
+                    metricas.contar('eventos_catalogo_recebido')
+                    self.ao_receber(json.loads(dados), desde)
+                if id_evento:
+                    desde = self.ultimo_id = int(id_evento)
+        return True
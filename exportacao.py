@@ -0,0 +1,129 @@
+import csv
+import importlib.util
+import io
+import tempfile
+
+import metricas
+from catalogo import COLUNAS, COLUNAS_API
+
+TAMANHO_PAGINA_EXPORTACAO = 1000
+# Limite de linhas de uma planilha do Excel (cabeçalho incluído); acima
+# disso o xlsxwriter descarta as linhas em silêncio
+LINHAS_POR_PLANILHA_EXCEL = 1048576
+# Acima deste tamanho o arquivo gerado sai da memória e vai para disco
+LIMITE_MEMORIA = 16 * 1024 * 1024
+
+FORMATOS = {
+    'CSV': ('csv', 'text/csv'),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+_DEPENDENCIAS = {
+    'Excel': 'xlsxwriter',
+    'Parquet': 'pyarrow',
+}
+
+
+def formatos_disponiveis():
+    return [
+        formato for formato in FORMATOS
+        if formato not in _DEPENDENCIAS or importlib.util.find_spec(_DEPENDENCIAS[formato])
+    ]
+
+
+def paginas_livros(cliente, tamanho_pagina=TAMANHO_PAGINA_EXPORTACAO):
+    """Percorre o catálogo em páginas usando o cursor por chave (apos=<id>)."""
+    ultimo_id = 0
+    while True:
+        response = cliente.get("/livros", params={'limite': tamanho_pagina, 'apos': ultimo_id})
+        response.raise_for_status()
+        livros = response.json() or []
+        if not livros:
+            return
+        yield [[livro[coluna] for coluna in COLUNAS_API] for livro in livros]
+        if len(livros) < tamanho_pagina:
+            return
+        ultimo_id = livros[-1]['id']
+
+
+def _escrever_csv(arquivo, paginas):
+    texto = io.TextIOWrapper(arquivo, encoding='utf-8', newline='')
+    escritor = csv.writer(texto)
+    escritor.writerow(COLUNAS)
+    linhas = 0
+    for pagina in paginas:
+        escritor.writerows(pagina)
+        linhas += len(pagina)
+    texto.flush()
+    texto.detach()
+    return linhas
+
+
+def _escrever_excel(arquivo, paginas):
+    import xlsxwriter
+
+    # constant_memory grava cada linha assim que ela é concluída
+    workbook = xlsxwriter.Workbook(arquivo, {'constant_memory': True})
+    planilha = None
+    linhas = 0
+    linha_planilha = LINHAS_POR_PLANILHA_EXCEL
+    for pagina in paginas:
+        for linha in pagina:
+            # Planilha cheia: continua em "Dados 2", "Dados 3"...
+            if linha_planilha == LINHAS_POR_PLANILHA_EXCEL:
+                numero = linhas // (LINHAS_POR_PLANILHA_EXCEL - 1) + 1
+                planilha = workbook.add_worksheet('Dados' if numero == 1 else f'Dados {numero}')
+                planilha.write_row(0, 0, COLUNAS)
+                linha_planilha = 1
+            if planilha.write_row(linha_planilha, 0, linha) != 0:
+                raise RuntimeError(f"Falha ao gravar a linha {linhas + 1} no Excel")
+            linha_planilha += 1
+            linhas += 1
+    if planilha is None:
+        workbook.add_worksheet('Dados').write_row(0, 0, COLUNAS)
+    workbook.close()
+    return linhas
+
+
+def _escrever_parquet(arquivo, paginas):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        (COLUNAS[0], pa.int64()),
+        *[(coluna, pa.string()) for coluna in COLUNAS[1:]],
+    ])
+    linhas = 0
+    # Um row group por página: só uma página fica em memória por vez
+    with pq.ParquetWriter(arquivo, schema) as escritor:
+        for pagina in paginas:
+            colunas = list(zip(*pagina))
+            escritor.write_table(pa.Table.from_arrays(
+                [pa.array(valores, type=campo.type) for valores, campo in zip(colunas, schema)],
+                schema=schema,
+            ))
+            linhas += len(pagina)
+    return linhas
+
+
+_ESCRITORES = {
+    'CSV': _escrever_csv,
+    'Excel': _escrever_excel,
+    'Parquet': _escrever_parquet,
+}
+
+
+def exportar(cliente, formato, tamanho_pagina=TAMANHO_PAGINA_EXPORTACAO):
+    """Gera o arquivo de exportação lendo a API página por página.
+
+    Devolve (arquivo, linhas); o arquivo é um SpooledTemporaryFile já
+    posicionado no início, que fica em memória até `LIMITE_MEMORIA`.
+    """
+    if formato not in _ESCRITORES:
+        raise ValueError(f"Formato de exportação desconhecido: {formato}")
+    arquivo = tempfile.SpooledTemporaryFile(max_size=LIMITE_MEMORIA)
+    with metricas.medir(f'exportacao {formato}'):
+        linhas = _ESCRITORES[formato](arquivo, paginas_livros(cliente, tamanho_pagina))
+    arquivo.seek(0)
+    return arquivo, linhas
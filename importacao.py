@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+import time
+
+from catalogo import CATEGORIAS, GENEROS
+from indice_busca import normalizar
+
+TAMANHO_LOTE = 500
+
+# Cabeçalhos aceitos, comparados sem acentos e sem caixa ("Título" -> "titulo")
+_CAMPOS = ('titulo', 'autor', 'genero', 'categoria')
+
+
+class ErroImportacao(Exception):
+    pass
+
+
+def ler_arquivo(nome, conteudo):
+    """Converte um upload CSV ou JSON em lista de (linha, registro)."""
+    texto = conteudo.decode('utf-8-sig') if isinstance(conteudo, bytes) else conteudo
+
+    if nome.lower().endswith('.json'):
+        try:
+            dados = json.loads(texto)
+        except json.JSONDecodeError as e:
+            raise ErroImportacao(f"JSON inválido: {e}")
+        if isinstance(dados, dict):
+            dados = dados.get('livros', [])
+        if not isinstance(dados, list):
+            raise ErroImportacao("O JSON deve ser uma lista de livros")
+        return list(enumerate(dados, start=1))
+
+    # CSV: a linha 1 é o cabeçalho
+    leitor = csv.DictReader(io.StringIO(texto, newline=''))
+    return list(enumerate(leitor, start=2))
+
+
+def validar(registros):
+    """Separa registros válidos (formato da API) dos inválidos.
+
+    Usa as mesmas regras dos formulários: título e autor obrigatórios,
+    gênero e categoria dentro das listas `GENEROS` e `CATEGORIAS`.
+    """
+    validos = []
+    erros = []
+    for linha, registro in registros:
+        if not isinstance(registro, dict):
+            erros.append({'linha': linha, 'erro': "Registro não é um objeto"})
+            continue
+
+        livro = {}
+        for chave, valor in registro.items():
+            campo = normalizar(chave or '').strip()
+            if campo in _CAMPOS:
+                livro[campo] = str(valor).strip() if valor is not None else ''
+
+        problemas = []
+        if not livro.get('titulo') or not livro.get('autor'):
+            problemas.append("título e autor são obrigatórios")
+        if livro.get('genero') not in GENEROS:
+            problemas.append(f"gênero inválido: {livro.get('genero', '')!r}")
+        if livro.get('categoria') not in CATEGORIAS:
+            problemas.append(f"categoria inválida: {livro.get('categoria', '')!r}")
+
+        if problemas:
+            erros.append({'linha': linha, 'erro': "; ".join(problemas)})
+        else:
+            validos.append((linha, livro))
+    return validos, erros
+
+
+def importar(cliente, validos, tamanho_lote=TAMANHO_LOTE, progresso=None):
+    """Envia os livros válidos em lotes para POST /livros/lote.
+
+    `progresso(enviados, total, criados, segundos)` é chamado após cada lote.
+    Devolve um dicionário com os totais, a vazão e os erros por linha.
+    """
+    total = len(validos)
+    criados = []
+    erros = []
+    inicio = time.perf_counter()
+
+    for posicao in range(0, total, tamanho_lote):
+        lote = validos[posicao:posicao + tamanho_lote]
+        try:
+            response = cliente.post("/livros/lote", json=[livro for _, livro in lote])
+            response.raise_for_status()
+            resultado = response.json()
+        except Exception as e:
+            erros.extend({'linha': linha, 'erro': f"Lote não enviado: {e}"} for linha, _ in lote)
+        else:
+            criados.extend(resultado['criados'])
+            erros.extend(
+                {'linha': lote[erro['indice']][0], 'erro': erro['erro']}
+                for erro in resultado['erros']
+            )
+
+        if progresso:
+            progresso(posicao + len(lote), total, len(criados), time.perf_counter() - inicio)
+
+    duracao = time.perf_counter() - inicio
+    return {
+        'criados': criados,
+        'erros': erros,
+        'duracao_s': duracao,
+        'livros_por_segundo': len(criados) / duracao if duracao > 0 else 0.0,
+    }
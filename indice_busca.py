@@ -0,0 +1,354 @@
+import re
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+_SEPARADOR_TOKENS = re.compile(r'\W+')
+# Separa título e autor (e os livros entre si) na montagem dos trigramas:
+# nenhum trigrama atravessa campos
+_SEPARADOR = '\x00'
+
+# Pesos de relevância: título vale o dobro do autor. Em cada campo, um termo
+# vale 1 ponto como substring, 2 como prefixo de palavra e 3 como palavra inteira
+PESO_TITULO = 2
+PESO_AUTOR = 1
+TAMANHO_TRIGRAMA = 3
+LINHAS_POR_BLOCO = 20000
+# Alterações acumuladas fora da base (livros novos/alterados + removidos)
+# a partir das quais vale reconstruir o índice inteiro
+LIMITE_SOBREPOSICAO = 2000
+FRACAO_SOBREPOSICAO = 0.05
+
+
+class _SemAcentos(dict):
+    """Tabela do str.translate que remove marcas combinantes, preenchida
+    sob demanda a cada caractere novo."""
+
+    def __missing__(self, codigo):
+        valor = None if unicodedata.combining(chr(codigo)) else codigo
+        self[codigo] = valor
+        return valor
+
+
+_SEM_ACENTOS = _SemAcentos()
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos: "Usuário" -> "usuario"."""
+    return unicodedata.normalize('NFKD', str(texto)).translate(_SEM_ACENTOS).casefold()
+
+
+def tokenizar(texto_normalizado):
+    return [t for t in _SEPARADOR_TOKENS.split(texto_normalizado) if t]
+
+
+_TABELAS = {}
+
+
+def _classificar(pontos, nome, teste):
+    """Máscara dos code points que passam em `teste`, por uma tabela do
+    plano básico montada na primeira vez (os demais são testados um a um)."""
+    if nome not in _TABELAS:
+        _TABELAS[nome] = np.fromiter((teste(chr(c)) for c in range(0x10000)), dtype=bool, count=0x10000)
+    mascara = _TABELAS[nome][np.minimum(pontos, 0xFFFF)]
+    fora = np.flatnonzero(pontos > 0xFFFF)
+    if len(fora):
+        mascara[fora] = [teste(chr(c)) for c in pontos[fora].tolist()]
+    return mascara
+
+
+def _letras_de_palavra(pontos):
+    # O que o \w do re aceita
+    return _classificar(pontos, 'palavra', lambda c: c.isalnum() or c == '_')
+
+
+def _normalizar_coluna(valores):
+    """`normalizar` aplicado à coluna inteira de uma vez, como um texto só."""
+    junto = unicodedata.normalize('NFKD', _SEPARADOR.join(map(str, valores)))
+    pontos = np.frombuffer(junto.encode('utf-32-le'), dtype=np.uint32)
+    pontos = pontos[~_classificar(pontos, 'combinante', unicodedata.combining)]
+    normalizados = pontos.tobytes().decode('utf-32-le').casefold().split(_SEPARADOR)
+    if len(normalizados) != len(valores):
+        # Algum valor já tinha o separador
+        normalizados = [normalizar(valor) for valor in valores]
+    return normalizados
+
+
+def _codigos(texto):
+    """Códigos dos trigramas do texto: três code points em um inteiro de 63 bits."""
+    pontos = [ord(c) for c in texto]
+    return {(a << 42) | (b << 21) | c for a, b, c in zip(pontos, pontos[1:], pontos[2:])}
+
+
+def _trigramas_bloco(textos, primeira_linha):
+    """Pares (código, linha) dos textos, sem os trigramas que cruzam o separador."""
+    pontos = np.frombuffer(_SEPARADOR.join(textos).encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    if len(pontos) < TAMANHO_TRIGRAMA:
+        return np.empty(0, np.uint64), np.empty(0, np.int32)
+    codigos = (pontos[:-2] << np.uint64(42)) | (pontos[1:-1] << np.uint64(21)) | pontos[2:]
+    tamanhos = np.fromiter((len(texto) + 1 for texto in textos), dtype=np.int64, count=len(textos))
+    linhas = np.repeat(np.arange(primeira_linha, primeira_linha + len(textos), dtype=np.int32), tamanhos)
+    linhas = linhas[:len(codigos)]
+    validos = (pontos[:-2] != 0) & (pontos[1:-1] != 0) & (pontos[2:] != 0)
+    return codigos[validos], linhas[validos]
+
+
+def _postagens(textos):
+    """Listas de postagem em três arrays: os trigramas distintos em ordem e,
+    para o i-ésimo, as linhas que o contêm em linhas[inicios[i]:inicios[i + 1]]."""
+    blocos = [
+        _trigramas_bloco(textos[inicio:inicio + LINHAS_POR_BLOCO], inicio)
+        for inicio in range(0, len(textos), LINHAS_POR_BLOCO)
+    ]
+    if not blocos:
+        return np.empty(0, np.uint64), np.zeros(1, np.int64), np.empty(0, np.int32)
+    codigos = np.concatenate([codigos for codigos, _ in blocos])
+    linhas = np.concatenate([linhas for _, linhas in blocos])
+    # Os blocos vêm em ordem de linha, então a ordenação estável deixa as
+    # linhas crescentes dentro de cada trigrama e as repetidas vizinhas
+    ordem = np.argsort(codigos, kind='stable')
+    codigos, linhas = codigos[ordem], linhas[ordem]
+    if len(codigos):
+        distintos = np.r_[True, (codigos[1:] != codigos[:-1]) | (linhas[1:] != linhas[:-1])]
+        codigos, linhas = codigos[distintos], linhas[distintos]
+    inicios = np.flatnonzero(np.r_[True, codigos[1:] != codigos[:-1]]) if len(codigos) else np.empty(0, np.int64)
+    return codigos[inicios], np.append(inicios, len(codigos)), linhas
+
+
+def _postagens_palavras(textos):
+    """Palavras distintas em ordem e, para a i-ésima, as linhas em que ela
+    aparece em linhas[inicios[i]:inicios[i + 1]]. Palavras com o mesmo
+    prefixo ficam vizinhas, então as linhas de um prefixo são uma fatia só.
+    As palavras são as mesmas de `tokenizar`."""
+    junto = _SEPARADOR.join(textos)
+    pontos = np.frombuffer(junto.encode('utf-32-le'), dtype=np.uint32)
+    letras = _letras_de_palavra(pontos)
+    bordas = np.diff(np.concatenate([[False], letras, [False]]).astype(np.int8))
+    comecos, fins = np.flatnonzero(bordas == 1), np.flatnonzero(bordas == -1)
+    inicios_textos = np.cumsum([0] + [len(texto) + 1 for texto in textos[:-1]])
+    linhas = np.searchsorted(inicios_textos, comecos, side='right') - 1
+
+    codigos, palavras = pd.factorize(
+        np.array([junto[a:b] for a, b in zip(comecos.tolist(), fins.tolist())], dtype=object), sort=True)
+    # Cada palavra uma vez por linha, em ordem de palavra e depois de linha
+    pares = np.sort(codigos.astype(np.int64) * max(len(textos), 1) + linhas)
+    pares = pares[np.r_[True, pares[1:] != pares[:-1]]] if len(pares) else pares
+    codigos, linhas = np.divmod(pares, max(len(textos), 1))
+    inicios = np.zeros(len(palavras) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codigos, minlength=len(palavras)), out=inicios[1:])
+    return palavras.tolist(), inicios, linhas.astype(np.int32)
+
+
+def _marcar(tamanho, linhas):
+    marcadas = np.zeros(tamanho, dtype=bool)
+    marcadas[linhas] = True
+    return marcadas
+
+
+def _contem(coluna, termo):
+    return coluna.str.contains(termo, regex=False).to_numpy(dtype=bool)
+
+
+class _Campo:
+    """Um campo normalizado (título ou autor): os textos, como coluna de
+    texto do pandas (em Arrow quando disponível), e as postagens das
+    palavras. Com `codigos`, os textos são os valores distintos e cada
+    linha guarda só o código do seu, como num categórico."""
+
+    def __init__(self, textos, codigos=None):
+        self.textos = pd.Series(textos)
+        self.codigos = codigos
+        self._palavras, self._inicios, self._linhas = _postagens_palavras(textos)
+
+    @classmethod
+    def de_coluna(cls, valores):
+        if not isinstance(getattr(valores, 'dtype', None), pd.CategoricalDtype):
+            return cls(_normalizar_coluna(list(valores)))
+        # Cada valor distinto é normalizado uma vez; o último nome é o dos
+        # ausentes, que viram "nan" como em normalizar()
+        nomes = _normalizar_coluna(valores.cat.categories.tolist() + [float('nan')])
+        codigos = valores.cat.codes.to_numpy()
+        codigos = np.where(codigos < 0, len(nomes) - 1, codigos)
+        # Valores diferentes podem ficar iguais depois de normalizados
+        mapa, distintos = pd.factorize(np.array(nomes, dtype=object))
+        return cls(distintos.tolist(), mapa[codigos].astype(np.int32))
+
+    def por_linha(self):
+        if self.codigos is None:
+            return self.textos.tolist()
+        return self.textos.to_numpy(dtype=object)[self.codigos].tolist()
+
+    def marcas(self, termo):
+        """Por linha: se alguma palavra começa por `termo` e se `termo` é uma das palavras."""
+        inicio = bisect_left(self._palavras, termo)
+        fim = bisect_left(self._palavras, termo + '\U0010ffff', inicio)
+        prefixo = self._linhas[self._inicios[inicio]:self._inicios[fim]]
+        exato = prefixo[:0]
+        if inicio < fim and self._palavras[inicio] == termo:
+            exato = self._linhas[self._inicios[inicio]:self._inicios[inicio + 1]]
+        marcas = _marcar(len(self.textos), prefixo), _marcar(len(self.textos), exato)
+        if self.codigos is None:
+            return marcas
+        return tuple(marca[self.codigos] for marca in marcas)
+
+    def contem(self, linhas, termo):
+        if self.codigos is None:
+            return _contem(self.textos.iloc[linhas], termo)
+        distintos, posicoes = np.unique(self.codigos[linhas], return_inverse=True)
+        return _contem(self.textos.iloc[distintos], termo)[posicoes]
+
+    def tamanhos(self, linhas):
+        indices = linhas if self.codigos is None else self.codigos[linhas]
+        return self.textos.iloc[indices].str.len().to_numpy(dtype=np.int64)
+
+
+class _Segmento:
+    """Livros indexados de uma vez: título e autor normalizados, com as
+    postagens de palavras de cada campo e as de trigramas dos dois juntos."""
+
+    def __init__(self, ids, titulo, autor):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.titulo = titulo
+        self.autor = autor
+        self._codigos, self._inicios, self._linhas = _postagens(
+            [t + _SEPARADOR + a for t, a in zip(titulo.por_linha(), autor.por_linha())])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _candidatos(self, termos):
+        """Linhas que têm todos os trigramas de todos os termos (interseção
+        das postagens, da menor para a maior); None se não há termo longo."""
+        codigos = set().union(*(_codigos(termo) for termo in termos if len(termo) >= TAMANHO_TRIGRAMA))
+        if not codigos:
+            return None
+        posicoes = np.searchsorted(self._codigos, np.fromiter(codigos, dtype=np.uint64, count=len(codigos)))
+        postagens = []
+        for codigo, posicao in zip(codigos, posicoes.tolist()):
+            if posicao == len(self._codigos) or self._codigos[posicao] != codigo:
+                return np.empty(0, np.int32)
+            postagens.append(self._linhas[self._inicios[posicao]:self._inicios[posicao + 1]])
+        postagens.sort(key=len)
+        resultado = postagens[0]
+        for postagem in postagens[1:]:
+            if not len(resultado):
+                break
+            encontrados = np.minimum(np.searchsorted(postagem, resultado), len(postagem) - 1)
+            resultado = resultado[postagem[encontrados] == resultado]
+        return resultado
+
+    def buscar(self, termos):
+        """(ids, pontos, tamanhos dos títulos) dos livros que casam com todos os termos."""
+        # Por termo, as marcações de prefixo e de palavra exata no título e no autor
+        marcas = [self.titulo.marcas(termo) + self.autor.marcas(termo) for termo in termos]
+
+        linhas = self._candidatos(termos)
+        for termo, (prefixo_titulo, _, prefixo_autor, _) in zip(termos, marcas):
+            if len(termo) < TAMANHO_TRIGRAMA:
+                casa = prefixo_titulo | prefixo_autor
+                linhas = np.flatnonzero(casa) if linhas is None else linhas[casa[linhas]]
+
+        # Termos longos: confirma a substring (trigramas presentes não a garantem)
+        substrings = {}
+        for i, termo in enumerate(termos):
+            if len(termo) >= TAMANHO_TRIGRAMA and len(linhas):
+                no_titulo, no_autor = self.titulo.contem(linhas, termo), self.autor.contem(linhas, termo)
+                casa = no_titulo | no_autor
+                linhas = linhas[casa]
+                substrings = {j: (t[casa], a[casa]) for j, (t, a) in substrings.items()}
+                substrings[i] = (no_titulo[casa], no_autor[casa])
+
+        pontos = np.zeros(len(linhas), dtype=np.int64)
+        if not len(linhas):
+            return self.ids[linhas], pontos, pontos
+        for i, (termo, marcas_termo) in enumerate(zip(termos, marcas)):
+            prefixo_titulo, exato_titulo, prefixo_autor, exato_autor = (m[linhas] for m in marcas_termo)
+            no_titulo, no_autor = substrings.get(i) or (
+                self.titulo.contem(linhas, termo), self.autor.contem(linhas, termo))
+            pontos += PESO_TITULO * (no_titulo.astype(np.int64) + prefixo_titulo + exato_titulo)
+            pontos += PESO_AUTOR * (no_autor.astype(np.int64) + prefixo_autor + exato_autor)
+        return self.ids[linhas], pontos, self.titulo.tamanhos(linhas)
+
+
+class IndiceBusca:
+    """Índice invertido de trigramas sobre título e autor.
+
+    Termos com 3 ou mais caracteres são buscados como substring: os
+    candidatos vêm da interseção das postagens de todos os trigramas de
+    todos os termos e são confirmados de forma vetorizada nas colunas
+    normalizadas. Termos mais curtos são buscados como prefixo de palavra.
+    Consultas com vários termos exigem todos eles (E lógico). Só os
+    `limite` melhores resultados são ordenados.
+
+    O índice acompanha o catálogo por delta (`atualizado`): livros
+    alterados ou novos vão para um segmento pequeno e os antigos saem da
+    base por uma lista de removidos, até `precisa_reconstruir`.
+    """
+
+    def __init__(self, ids, titulos, autores):
+        self._base = _Segmento(ids, _Campo.de_coluna(titulos), _Campo.de_coluna(autores))
+        self._extra = _Segmento([], _Campo([]), _Campo([]))
+        self._removidos = np.empty(0, np.int64)
+
+    @classmethod
+    def do_dataframe(cls, df):
+        return cls(df['ID'].to_numpy(), df['Título'], df['Autor'])
+
+    def __len__(self):
+        return len(self._base) - len(self._removidos) + len(self._extra)
+
+    @property
+    def precisa_reconstruir(self):
+        sobreposicao = len(self._extra) + len(self._removidos)
+        return sobreposicao > max(LIMITE_SOBREPOSICAO, FRACAO_SOBREPOSICAO * len(self._base))
+
+    def atualizado(self, df, ids):
+        """Novo índice com os livros `ids` como estão em `df` (o catálogo
+        atual, indexado por ID): presentes são incluídos ou trocados,
+        ausentes são retirados. O índice atual continua válido."""
+        ids = np.fromiter(ids, dtype=np.int64)
+        presentes = df.loc[df.index.intersection(ids)]
+        manter = ~np.isin(self._extra.ids, ids)
+
+        novo = object.__new__(IndiceBusca)
+        novo._base = self._base
+        novo._removidos = np.union1d(self._removidos, self._base.ids[np.isin(self._base.ids, ids)])
+        novo._extra = _Segmento(
+            np.concatenate([self._extra.ids[manter], presentes['ID'].to_numpy(dtype=np.int64)]),
+            _Campo(self._extra.titulo.textos[manter].tolist() + _normalizar_coluna(presentes['Título'].tolist())),
+            _Campo(self._extra.autor.textos[manter].tolist() + _normalizar_coluna(presentes['Autor'].tolist())),
+        )
+        return novo
+
+    def _ids_vivos(self):
+        base = self._base.ids
+        if len(self._removidos):
+            base = base[~np.isin(base, self._removidos)]
+        return np.sort(np.concatenate([base, self._extra.ids]))
+
+    def buscar(self, consulta, limite=None):
+        """IDs que casam com a consulta, do mais para o menos relevante."""
+        termos = tokenizar(normalizar(consulta))
+        if not termos:
+            return self._ids_vivos()[:limite].tolist()
+
+        ids, pontos, tamanhos = self._base.buscar(termos)
+        if len(self._removidos):
+            vivos = ~np.isin(ids, self._removidos)
+            ids, pontos, tamanhos = ids[vivos], pontos[vivos], tamanhos[vivos]
+        if len(self._extra):
+            extra = self._extra.buscar(termos)
+            ids, pontos, tamanhos = (np.concatenate([a, b]) for a, b in zip((ids, pontos, tamanhos), extra))
+        if not len(ids):
+            return []
+
+        # Mais pontos, depois título mais curto, depois menor ID, em uma só chave
+        chave = ((pontos.max() - pontos) * (tamanhos.max() + 1) + tamanhos) * (ids.max() + 1) + ids
+        if limite is not None and limite < len(chave):
+            selecionados = np.argpartition(chave, limite - 1)[:limite]
+            selecionados = selecionados[np.argsort(chave[selecionados])]
+        else:
+            selecionados = np.argsort(chave)
+        return ids[selecionados].tolist()
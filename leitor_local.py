@@ -0,0 +1,75 @@
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+
+import metricas
+from agregados import resumir_contagens
+
+
+class LeitorBancoLocal:
+    """Leitura direta (somente leitura) do biblioteca.db do backend, para
+    quando o app roda na mesma máquina que a API.
+
+    Os agregados do dashboard saem de GROUP BY sobre os índices de
+    autor/gênero/categoria, sem baixar o catálogo pela API, e só são
+    recalculados quando a seq do log de alterações muda.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = Path(caminho).resolve()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._resumo = None
+        self._seq_resumo = None
+        # Falha já na criação se o arquivo não existir (mode=ro não o cria)
+        self._conexao().execute("SELECT 1 FROM livros LIMIT 1")
+
+    def _conexao(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(f"{self.caminho.as_uri()}?mode=ro", uri=True, timeout=30,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA query_only = ON")
+            self._local.conn = conn
+        return conn
+
+    def seq(self):
+        try:
+            return self._conexao().execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM livros_alteracoes").fetchone()[0]
+        except sqlite3.OperationalError:
+            # Banco anterior ao log de alterações: sem versão, sempre recalcula
+            return None
+
+    @metricas.cronometrado('leitor_local_agregados')
+    def _calcular_resumo(self):
+        conn = self._conexao()
+        # Uma transação de leitura: todas as contagens do mesmo snapshot
+        conn.execute("BEGIN")
+        try:
+            total = conn.execute("SELECT COUNT(*) FROM livros").fetchone()[0]
+            generos = Counter(dict(conn.execute(
+                "SELECT genero, COUNT(*) FROM livros WHERE genero IS NOT NULL GROUP BY genero")))
+            categorias = Counter(dict(conn.execute(
+                "SELECT categoria, COUNT(*) FROM livros WHERE categoria IS NOT NULL GROUP BY categoria")))
+            autores = Counter(dict(conn.execute(
+                "SELECT autor, COUNT(*) FROM livros GROUP BY autor")))
+        finally:
+            conn.execute("COMMIT")
+        return resumir_contagens(total, generos, categorias, autores)
+
+    def agregados(self):
+        with self._lock:
+            seq = self.seq()
+            if self._resumo is None or seq is None or seq != self._seq_resumo:
+                self._resumo = self._calcular_resumo()
+                self._seq_resumo = seq
+                metricas.contar('leitor_local_recalculo')
+            return self._resumo
+
+    def fechar(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
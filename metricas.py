@@ -0,0 +1,152 @@
+import contextvars
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+PREFIXO = 'biblioteca'
+LIMITES_HISTOGRAMA = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+# Medições da execução atual do script (perfil por rerun). Como é um
+# ContextVar, também é visto pelas tarefas de asyncio.to_thread.
+_perfil_atual = contextvars.ContextVar('perfil_atual', default=None)
+
+
+class Histograma:
+    __slots__ = ('contagens', 'total', 'soma', 'maximo')
+
+    def __init__(self):
+        self.contagens = [0] * len(LIMITES_HISTOGRAMA)
+        self.total = 0
+        self.soma = 0.0
+        self.maximo = 0.0
+
+    def observar(self, valor):
+        for i, limite in enumerate(LIMITES_HISTOGRAMA):
+            if valor <= limite:
+                self.contagens[i] += 1
+                break
+        self.total += 1
+        self.soma += valor
+        self.maximo = max(self.maximo, valor)
+
+    def quantil(self, q):
+        # Aproximado pelo limite superior do bucket que contém o quantil
+        alvo = q * self.total
+        acumulado = 0
+        for limite, contagem in zip(LIMITES_HISTOGRAMA, self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return min(limite, self.maximo)
+        return self.maximo
+
+
+class RegistroMetricas:
+    """Histogramas de duração por operação e contadores de eventos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histogramas = {}
+        self._contadores = {}
+
+    def observar(self, operacao, segundos):
+        with self._lock:
+            histograma = self._histogramas.get(operacao)
+            if histograma is None:
+                histograma = self._histogramas[operacao] = Histograma()
+            histograma.observar(segundos)
+        perfil = _perfil_atual.get()
+        if perfil is not None:
+            perfil.append((operacao, segundos))
+
+    def contar(self, evento, quantidade=1):
+        with self._lock:
+            self._contadores[evento] = self._contadores.get(evento, 0) + quantidade
+
+    @contextmanager
+    def medir(self, operacao):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(operacao, time.perf_counter() - inicio)
+
+    def cronometrado(self, operacao):
+        def decorador(funcao):
+            @functools.wraps(funcao)
+            def envoltorio(*args, **kwargs):
+                with self.medir(operacao):
+                    return funcao(*args, **kwargs)
+            return envoltorio
+        return decorador
+
+    def exportar_json(self):
+        with self._lock:
+            return {
+                'operacoes': {
+                    operacao: {
+                        'contagem': h.total,
+                        'soma_s': round(h.soma, 6),
+                        'media_ms': round(h.soma / h.total * 1000, 3) if h.total else 0.0,
+                        'p50_ms': round(h.quantil(0.50) * 1000, 3),
+                        'p95_ms': round(h.quantil(0.95) * 1000, 3),
+                        'p99_ms': round(h.quantil(0.99) * 1000, 3),
+                        'max_ms': round(h.maximo * 1000, 3),
+                    }
+                    for operacao, h in sorted(self._histogramas.items())
+                },
+                'eventos': dict(sorted(self._contadores.items())),
+            }
+
+    def exportar_prometheus(self):
+        nome_hist = f'{PREFIXO}_operacao_duracao_segundos'
+        nome_cont = f'{PREFIXO}_eventos_total'
+        linhas = [
+            f'# HELP {nome_hist} Duração das operações instrumentadas.',
+            f'# TYPE {nome_hist} histogram',
+        ]
+        with self._lock:
+            for operacao, h in sorted(self._histogramas.items()):
+                rotulo = _rotulo(operacao)
+                acumulado = 0
+                for limite, contagem in zip(LIMITES_HISTOGRAMA, h.contagens):
+                    acumulado += contagem
+                    le = '+Inf' if math.isinf(limite) else repr(limite)
+                    linhas.append(f'{nome_hist}_bucket{{operacao="{rotulo}",le="{le}"}} {acumulado}')
+                linhas.append(f'{nome_hist}_sum{{operacao="{rotulo}"}} {h.soma}')
+                linhas.append(f'{nome_hist}_count{{operacao="{rotulo}"}} {h.total}')
+
+            linhas.append(f'# HELP {nome_cont} Contadores de eventos (cache, erros, etc.).')
+            linhas.append(f'# TYPE {nome_cont} counter')
+            for evento, valor in sorted(self._contadores.items()):
+                linhas.append(f'{nome_cont}{{evento="{_rotulo(evento)}"}} {valor}')
+        return '\n'.join(linhas) + '\n'
+
+    def limpar(self):
+        with self._lock:
+            self._histogramas.clear()
+            self._contadores.clear()
+
+
+def _rotulo(texto):
+    return str(texto).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+def iniciar_perfil():
+    """Passa a registrar as medições desta execução; devolve a lista."""
+    perfil = []
+    _perfil_atual.set(perfil)
+    return perfil
+
+
+def perfil_atual():
+    return _perfil_atual.get() or []
+
+
+# Registro global do processo
+REGISTRO = RegistroMetricas()
+observar = REGISTRO.observar
+contar = REGISTRO.contar
+medir = REGISTRO.medir
+cronometrado = REGISTRO.cronometrado
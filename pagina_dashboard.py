@@ -0,0 +1,166 @@
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from carregamento import carregar_em_paralelo
+from exportacao import FORMATOS, exportar, formatos_disponiveis
+from metricas import cronometrado
+from recursos import mostrar_idade_catalogo, obter_catalogo, obter_cliente
+
+@cronometrado('dashboard_graficos_distribuicoes')
+def mostrar_distribuicoes(agregados, total):
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📊 Distribuição por Gênero")
+        generos_count = pd.Series(agregados['generos'], dtype='int64')
+        st.bar_chart(generos_count)
+        
+        st.markdown("### Detalhamento por Gênero")
+        generos_df = pd.DataFrame({
+            'Gênero': generos_count.index,
+            'Quantidade': generos_count.values,
+            'Percentual': (generos_count.values / total * 100).round(1)
+        })
+        generos_df['Percentual'] = generos_df['Percentual'].apply(lambda x: f"{x}%")
+        st.dataframe(generos_df, hide_index=True)
+    
+    with col2:
+        st.subheader("📊 Distribuição por Categoria")
+        categorias_count = pd.Series(agregados['categorias'], dtype='int64')
+        st.bar_chart(categorias_count)
+        
+        st.markdown("### Detalhamento por Categoria")
+        categorias_df = pd.DataFrame({
+            'Categoria': categorias_count.index,
+            'Quantidade': categorias_count.values,
+            'Percentual': (categorias_count.values / total * 100).round(1)
+        })
+        categorias_df['Percentual'] = categorias_df['Percentual'].apply(lambda x: f"{x}%")
+        st.dataframe(categorias_df, hide_index=True)
+
+@cronometrado('dashboard_graficos_autores')
+def mostrar_autores(agregados, total):
+    st.subheader("👥 Análise de Autores")
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### Top 10 Autores")
+        top_autores = pd.Series(agregados['top_autores'], dtype='int64')
+        st.bar_chart(top_autores)
+        
+        top_autores_df = pd.DataFrame({
+            'Autor': top_autores.index,
+            'Quantidade': top_autores.values,
+            'Percentual': (top_autores.values / total * 100).round(1)
+        })
+        top_autores_df['Percentual'] = top_autores_df['Percentual'].apply(lambda x: f"{x}%")
+        st.dataframe(top_autores_df, hide_index=True)
+    
+    with col2:
+        st.markdown("### Distribuição de Livros por Autor")
+        faixas = agregados['distribuicao_autores']
+        distribuicao_df = pd.DataFrame({
+            'Categoria': [
+                'Autores com 1 livro',
+                'Autores com 2-5 livros',
+                'Autores com mais de 5 livros'
+            ],
+            'Quantidade': [
+                faixas['1'],
+                faixas['2-5'],
+                faixas['>5']
+            ]
+        })
+        st.dataframe(distribuicao_df, hide_index=True)
+
+def dashboard():
+    st.header("📊 Dashboard")
+    
+    try:
+        catalogo = obter_catalogo()
+        
+        # Espaços reservados: cada seção é desenhada assim que seus dados chegam
+        colunas = st.columns(4)
+        cartoes = [coluna.empty() for coluna in colunas]
+        for cartao in cartoes:
+            cartao.caption("⏳ Carregando...")
+        st.markdown("---")
+        secao_distribuicoes = st.empty()
+        secao_distribuicoes.info("⏳ Carregando distribuições...")
+        st.markdown("---")
+        secao_autores = st.empty()
+        secao_autores.info("⏳ Carregando análise de autores...")
+        
+        vazio = False
+        
+        def ao_concluir(nome, resultado, erro):
+            nonlocal vazio
+            if erro is not None:
+                # Nenhum espaço da tarefa que falhou fica em "Carregando..."
+                if nome == 'total':
+                    cartoes[0].error("❌ Erro ao carregar o total")
+                else:
+                    for cartao in cartoes[1:]:
+                        cartao.caption("—")
+                    secao_distribuicoes.error(f"❌ Erro ao carregar dados: {str(erro)}")
+                    secao_autores.empty()
+                return
+            
+            if nome == 'total':
+                # Vem da contagem do servidor, normalmente antes dos agregados
+                cartoes[0].metric("Total de Livros", resultado)
+            elif nome == 'agregados':
+                # Agregados mantidos por delta: custo O(valores distintos), não O(livros)
+                total = resultado['total_livros']
+                if total == 0:
+                    vazio = True
+                    for cartao in cartoes[1:]:
+                        cartao.empty()
+                    secao_distribuicoes.info("📢 Nenhum dado disponível para análise.")
+                    secao_autores.empty()
+                    return
+                cartoes[1].metric("Autores Únicos", resultado['autores_unicos'])
+                cartoes[2].metric("Gêneros", len(resultado['generos']))
+                cartoes[3].metric("Categorias", len(resultado['categorias']))
+                with secao_distribuicoes.container():
+                    mostrar_distribuicoes(resultado, total)
+                with secao_autores.container():
+                    mostrar_autores(resultado, total)
+        
+        # Contagem (rápida) e agregados (carga inicial mais lenta) em paralelo
+        carregar_em_paralelo({
+            'total': lambda: catalogo.listar_pagina(limite=0)[2],
+            'agregados': catalogo.obter_agregados,
+        }, ao_concluir)
+        mostrar_idade_catalogo()
+        
+        if vazio:
+            return
+        
+        # Exportação de dados
+        st.markdown("---")
+        st.subheader("📥 Exportar Dados")
+        
+        formato = st.selectbox("Formato", formatos_disponiveis())
+        cliente = obter_cliente()
+        
+        def gerar_arquivo():
+            # Chamado pelo Streamlit só no clique, fora da execução da página:
+            # o arquivo é lido da API página por página e nada fica na sessão
+            arquivo, _ = exportar(cliente, formato)
+            with arquivo:
+                return arquivo.read()
+        
+        extensao, mime = FORMATOS[formato]
+        st.download_button(
+            f"📥 Baixar {formato}",
+            data=gerar_arquivo,
+            file_name=f'biblioteca_dados_{datetime.now().strftime("%Y%m%d")}.{extensao}',
+            mime=mime,
+            on_click="ignore"
+        )
+            
+    except Exception as e:
+        st.error(f"❌ Erro ao gerar dashboard: {str(e)}")
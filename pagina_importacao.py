@@ -0,0 +1,62 @@
+import csv
+
+import pandas as pd
+import streamlit as st
+
+from importacao import ErroImportacao, importar, ler_arquivo, validar
+from recursos import obter_catalogo, obter_cliente
+
+def importar_livros():
+    st.header("📥 Importar Livros em Lote")
+    st.caption("Arquivo CSV (com cabeçalho) ou JSON com os campos título, autor, gênero e categoria.")
+    
+    arquivo = st.file_uploader("Arquivo de livros", type=["csv", "json"])
+    if not arquivo:
+        return
+    
+    try:
+        registros = ler_arquivo(arquivo.name, arquivo.getvalue())
+    except (ErroImportacao, UnicodeDecodeError, csv.Error) as e:
+        st.error(f"❌ Erro ao ler arquivo: {str(e)}")
+        return
+    
+    validos, invalidos = validar(registros)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Registros", len(registros))
+    with col2:
+        st.metric("Válidos", len(validos))
+    with col3:
+        st.metric("Inválidos", len(invalidos))
+    
+    if invalidos:
+        with st.expander("⚠️ Registros inválidos (não serão enviados)"):
+            st.dataframe(pd.DataFrame(invalidos), hide_index=True)
+    
+    if not validos or not st.button("📚 Importar livros válidos"):
+        return
+    
+    barra = st.progress(0.0, text="Iniciando importação...")
+    
+    def atualizar_progresso(enviados, total, criados, segundos):
+        vazao = criados / segundos if segundos > 0 else 0
+        barra.progress(enviados / total, text=f"{enviados}/{total} enviados · {vazao:.0f} livros/s")
+    
+    try:
+        resultado = importar(obter_cliente(), validos, progresso=atualizar_progresso)
+    finally:
+        obter_catalogo().invalidar()
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Livros cadastrados", len(resultado['criados']))
+    with col2:
+        st.metric("Erros", len(resultado['erros']))
+    with col3:
+        st.metric("Vazão", f"{resultado['livros_por_segundo']:.0f} livros/s")
+    
+    if resultado['erros']:
+        st.error("❌ Alguns livros não foram cadastrados:")
+        st.dataframe(pd.DataFrame(resultado['erros']), hide_index=True)
+    else:
+        st.success(f"✅ Importação concluída em {resultado['duracao_s']:.1f}s!")
@@ -0,0 +1,264 @@
+import requests
+import streamlit as st
+
+from catalogo import CATEGORIAS, GENEROS, livros_para_dataframe
+from recursos import mostrar_idade_catalogo, obter_catalogo
+
+TAMANHOS_PAGINA = [25, 50, 100, 250]
+LIMITE_SUGESTOES = 20
+
+def editar_livro(livro):
+    st.subheader(f"📝 Editar Livro: {livro['Título']}")
+    
+    with st.form(key=f"edit_form_{livro['ID']}", clear_on_submit=False):
+        novo_titulo = st.text_input("Título*", value=livro['Título'])
+        novo_autor = st.text_input("Autor*", value=livro['Autor'])
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            novo_genero = st.selectbox(
+                "Gênero",
+                options=GENEROS,
+                index=GENEROS.index(livro['Gênero']) if livro['Gênero'] in GENEROS else 0
+            )
+        
+        with col2:
+            nova_categoria = st.selectbox(
+                "Categoria",
+                options=CATEGORIAS,
+                index=CATEGORIAS.index(livro['Categoria']) if livro['Categoria'] in CATEGORIAS else 0
+            )
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            submitted = st.form_submit_button("💾 Salvar Alterações")
+        with col2:
+            cancelar = st.form_submit_button("❌ Cancelar")
+        
+        if submitted:
+            if not novo_titulo or not novo_autor:
+                st.error("❌ Título e autor são campos obrigatórios!")
+                return False
+            
+            dados_atualizados = {
+                "titulo": novo_titulo,
+                "autor": novo_autor,
+                "genero": novo_genero,
+                "categoria": nova_categoria
+            }
+            
+            # Aplicado no cache antes da resposta; desfeito se o PUT falhar
+            try:
+                obter_catalogo().atualizar_livro(livro['ID'], dados_atualizados)
+                st.success("✅ Livro atualizado com sucesso!")
+                return True
+            except requests.exceptions.HTTPError as e:
+                st.error(f"❌ Erro ao atualizar livro: {e.response.text}")
+                return False
+            except Exception as e:
+                st.error(f"❌ Erro: {str(e)}")
+                return False
+        
+        if cancelar:
+            return True
+    
+    return False
+
+def adicionar_livro():
+    st.header("➕ Adicionar Novo Livro")
+    
+    with st.form(key="form_livro", clear_on_submit=True):
+        st.subheader("Informações do Livro")
+        
+        titulo = st.text_input("Título do Livro*")
+        autor = st.text_input("Nome do Autor*")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            genero = st.selectbox("Gênero", GENEROS)
+        
+        with col2:
+            categoria = st.selectbox("Categoria", CATEGORIAS)
+        
+        submitted = st.form_submit_button("📚 Cadastrar Livro")
+        
+        if submitted:
+            if not titulo or not autor:
+                st.error("❌ Título e autor são campos obrigatórios!")
+                return
+            
+            novo_livro = {
+                "titulo": titulo,
+                "autor": autor,
+                "genero": genero,
+                "categoria": categoria
+            }
+            
+            try:
+                livro_criado = obter_catalogo().criar_livro(novo_livro)
+                st.success("✅ Livro cadastrado com sucesso!")
+                st.json(livro_criado)
+            except requests.exceptions.HTTPError as e:
+                st.error(f"❌ Erro ao cadastrar livro: {e.response.text}")
+            except requests.exceptions.ConnectionError:
+                st.error("❌ Erro de conexão com o servidor!")
+            except Exception as e:
+                st.error(f"❌ Erro inesperado: {str(e)}")
+
+def listar_livros():
+    st.header("📚 Biblioteca Digital")
+    
+    try:
+        # Filtros (aplicados no servidor)
+        with st.expander("🔍 Filtros de Busca", expanded=True):
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                busca = st.text_input("🔎 Buscar por título ou autor")
+            
+            with col2:
+                generos = st.multiselect("Filtrar por Gênero", options=GENEROS)
+            
+            with col3:
+                categorias = st.multiselect("Filtrar por Categoria", options=CATEGORIAS)
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                tamanho_pagina = st.selectbox("Livros por página", TAMANHOS_PAGINA, index=1)
+            
+            # Filtros ou tamanho de página mudaram: volta para a primeira página.
+            # O número da página só pode ser alterado antes do widget ser criado
+            filtros = (busca.strip(), tuple(generos), tuple(categorias), tamanho_pagina)
+            if st.session_state.get('filtros_listagem') != filtros:
+                st.session_state.filtros_listagem = filtros
+                st.session_state.pagina_listagem = 1
+            elif 'pagina_ajustada' in st.session_state:
+                st.session_state.pagina_listagem = st.session_state.pop('pagina_ajustada')
+            with col2:
+                pagina = st.number_input("Página", min_value=1, step=1, key="pagina_listagem")
+            
+            # Filtros e busca textual (índice FTS5) resolvidos no servidor: o
+            # custo é o da página, sem baixar o catálogo para a réplica
+            livros, total_filtrado, total_acervo = obter_catalogo().listar_pagina(
+                busca=busca.strip(),
+                generos=generos,
+                categorias=categorias,
+                limite=tamanho_pagina,
+                offset=(pagina - 1) * tamanho_pagina
+            )
+            
+            # Métricas
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Total de Livros", total_acervo)
+            with col2:
+                st.metric("Livros Filtrados", total_filtrado)
+            with col3:
+                percentual = (total_filtrado / total_acervo * 100) if total_acervo > 0 else 0
+                st.metric("Percentual", f"{percentual:.1f}%")
+        
+        if total_acervo == 0:
+            st.info("📢 Nenhum livro cadastrado ainda.")
+            return
+        
+        total_paginas = max(1, -(-total_filtrado // tamanho_pagina))
+        if pagina > total_paginas:
+            # Página além do fim (ex.: livros excluídos): vai para a última
+            st.session_state.pagina_ajustada = total_paginas
+            st.rerun()
+        st.caption(f"Página {pagina} de {total_paginas}")
+        if not livros:
+            st.info("📢 Nenhum livro encontrado com os filtros atuais.")
+            return
+        
+        df_filtrado = livros_para_dataframe(livros)
+        
+        # Tabela principal
+        st.dataframe(
+            df_filtrado,
+            column_config={
+                "ID": st.column_config.NumberColumn("ID", help="Identificador único"),
+                "Título": st.column_config.TextColumn("Título", help="Título do livro", width="large"),
+                "Autor": st.column_config.TextColumn("Autor", help="Nome do autor"),
+                "Gênero": st.column_config.TextColumn("Gênero", help="Gênero literário"),
+                "Categoria": st.column_config.TextColumn("Categoria", help="Tipo do livro")
+            },
+            hide_index=True,
+        )
+        
+        # Gerenciamento (apenas para admin)
+        if st.session_state.user_info['role'] == 'admin':
+            st.markdown("---")
+            st.subheader("🛠️ Gerenciar Livros")
+            
+            # Opções leves (ID, título, autor): a página atual ou os melhores
+            # resultados do índice; o livro completo só é carregado ao editar
+            busca_gerenciar = st.text_input("🔎 Buscar livro para gerenciar (ID ou título)")
+            if busca_gerenciar.strip():
+                opcoes = obter_catalogo().sugerir(busca_gerenciar.strip(), limite=LIMITE_SUGESTOES)
+                mostrar_idade_catalogo()
+            else:
+                opcoes = list(zip(
+                    df_filtrado['ID'].tolist(),
+                    df_filtrado['Título'].tolist(),
+                    df_filtrado['Autor'].tolist()
+                ))
+            
+            livro_selecionado = st.selectbox(
+                "Selecione um livro para gerenciar:",
+                options=opcoes,
+                format_func=lambda x: f"#{x[0]} · {x[1]} - {x[2]}"
+            )
+            
+            if livro_selecionado:
+                id_selecionado, titulo_selecionado, _ = livro_selecionado
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.button("📝 Editar"):
+                        livro = obter_catalogo().obter_livro(id_selecionado)
+                        if livro is None:
+                            st.error("❌ Livro não encontrado!")
+                        else:
+                            st.session_state.editing = True
+                            st.session_state.editing_book = livro
+                            st.rerun()
+                
+                with col2:
+                    # O botão só vale no rerun em que foi clicado: a confirmação
+                    # fica pendente no session_state até o próximo clique
+                    if st.button("🗑️ Excluir"):
+                        st.session_state.confirmar_exclusao = id_selecionado
+                
+                if st.session_state.get('confirmar_exclusao') == id_selecionado:
+                    st.warning(f"🚨 Tem certeza que deseja excluir '{titulo_selecionado}'?")
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.button("✅ Sim, excluir"):
+                            st.session_state.confirmar_exclusao = None
+                            try:
+                                obter_catalogo().excluir_livro(id_selecionado)
+                                st.success("✅ Livro excluído com sucesso!")
+                                st.rerun()
+                            except requests.exceptions.HTTPError as e:
+                                if e.response.status_code == 404:
+                                    st.error("❌ Livro não encontrado: ele pode já ter sido excluído.")
+                                else:
+                                    st.error("❌ Erro ao excluir livro!")
+                            except Exception as e:
+                                st.error(f"❌ Erro: {str(e)}")
+                    with col2:
+                        if st.button("❌ Não, cancelar"):
+                            st.session_state.confirmar_exclusao = None
+                            st.rerun()
+            
+            # Mostrar formulário de edição se estiver editando
+            if st.session_state.get('editing', False) and st.session_state.get('editing_book'):
+                if editar_livro(st.session_state.editing_book):
+                    st.session_state.editing = False
+                    st.session_state.editing_book = None
+                    st.rerun()
+                
+    except requests.exceptions.ConnectionError:
+        st.error("❌ Erro de conexão com o servidor!")
+    except Exception as e:
+        st.error(f"❌ Erro ao carregar livros: {str(e)}")
@@ -0,0 +1,65 @@
+import os
+
+import streamlit as st
+
+from estado_compartilhado import conectar
+
+API_URL = os.environ.get("BIBLIOTECA_API_URL", "http://localhost:8080")
+# Estado compartilhado entre réplicas (sessões e cache do catálogo):
+# sqlite:///arquivo.db, redis://host:6379/0 ou memoria:// (só este processo)
+ESTADO_URL = os.environ.get("BIBLIOTECA_ESTADO_URL", "sqlite:///estado.db")
+# Caminho do biblioteca.db quando o app roda na mesma máquina que o backend;
+# os agregados do dashboard passam a ser lidos direto do banco
+BANCO_LOCAL = os.environ.get("BIBLIOTECA_DB")
+# Endereços dos proxies reversos cujo X-Forwarded-For é confiável (separados
+# por vírgula); sem eles, o IP do cliente é o da própria conexão
+PROXIES_CONFIAVEIS = frozenset(
+    endereco.strip() for endereco in os.environ.get("BIBLIOTECA_PROXIES_CONFIAVEIS", "").split(",")
+    if endereco.strip()
+)
+
+# Recursos compartilhados pelas páginas, um por processo. Os módulos do
+# cliente (requests) e do catálogo (pandas) só são importados no primeiro uso.
+@st.cache_resource
+def obter_estado():
+    return conectar(ESTADO_URL)
+
+@st.cache_resource
+def obter_cliente():
+    from cliente_api import ClienteAPI
+    return ClienteAPI(API_URL)
+
+@st.cache_resource
+def obter_leitor_local():
+    if not BANCO_LOCAL:
+        return None
+    import sqlite3
+
+    import metricas
+    from leitor_local import LeitorBancoLocal
+    try:
+        return LeitorBancoLocal(BANCO_LOCAL)
+    except sqlite3.Error:
+        # Banco indisponível: o dashboard continua pela API
+        metricas.contar('leitor_local_erro')
+        return None
+
+@st.cache_resource
+def obter_catalogo():
+    from catalogo import CacheCatalogo
+    catalogo = CacheCatalogo(obter_cliente(), estado=obter_estado(), leitor=obter_leitor_local())
+    # Carrega o catálogo já, em segundo plano, e o mantém em dia: as páginas
+    # leem o último snapshot em vez de esperar pelo backend
+    catalogo.iniciar_atualizacao()
+    # Escritas de outras réplicas chegam pelo fluxo de eventos do backend
+    catalogo.iniciar_eventos()
+    return catalogo
+
+def mostrar_idade_catalogo():
+    situacao = obter_catalogo().situacao()
+    if situacao['idade_s'] is None:
+        return
+    if situacao['erro']:
+        st.warning(f"⚠️ Backend indisponível; exibindo dados de {situacao['idade_s']:.0f}s atrás.")
+    else:
+        st.caption(f"🕒 Catálogo atualizado há {situacao['idade_s']:.0f}s")
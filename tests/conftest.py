@@ -0,0 +1,15 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(RAIZ), str(RAIZ / 'benchmarks')]
+
+from servidor_local import ServidorLocal  # noqa: E402
+
+
+@pytest.fixture
+def servidor():
+    with ServidorLocal(50) as servidor:
+        yield servidor
@@ -0,0 +1,159 @@
+"""Snapshot do catálogo contra a API local (benchmarks/servidor_local.py):
+escritas otimistas, eventos e sincronização por delta."""
+import time
+
+import pytest
+import requests
+
+from agregados import AgregadosCatalogo
+from catalogo import CacheCatalogo
+from cliente_api import ClienteAPI
+
+LIVRO = {'titulo': 'NOVO', 'autor': 'Autora Nova', 'genero': 'Outro', 'categoria': 'E-book'}
+
+
+def catalogo_carregado(servidor, **opcoes_cliente):
+    catalogo = CacheCatalogo(ClienteAPI(servidor.url, **opcoes_cliente))
+    catalogo.obter_dataframe()
+    return catalogo
+
+
+def esperar(condicao, timeout=5):
+    limite = time.monotonic() + timeout
+    while not condicao():
+        if time.monotonic() > limite:
+            pytest.fail("condição não atingida a tempo")
+        time.sleep(0.02)
+
+
+def delta_desde(servidor, seq):
+    _, delta, _ = servidor.alteracoes({'desde': [str(seq)]})
+    return delta
+
+
+def assert_igual_ao_backend(catalogo, servidor):
+    df = catalogo.snapshot.dataframe()
+    _, livros, _ = servidor.listar({}, None)
+    assert df['ID'].tolist() == [livro['id'] for livro in livros]
+    assert df['Título'].tolist() == [livro['titulo'] for livro in livros]
+    esperado = AgregadosCatalogo.do_dataframe(df).resumo()
+    assert catalogo.snapshot.agregados.resumo() == esperado
+
+
+def test_escrita_otimista_aparece_no_snapshot(servidor):
+    catalogo = catalogo_carregado(servidor)
+    total = catalogo.obter_agregados()['total_livros']
+
+    catalogo.atualizar_livro(3, LIVRO)
+    criado = catalogo.criar_livro(LIVRO)
+    catalogo.excluir_livro(5)
+
+    df = catalogo.snapshot.dataframe()
+    assert df.loc[3, 'Título'] == 'NOVO'
+    assert criado['id'] in df.index
+    assert 5 not in df.index
+    assert catalogo.obter_agregados()['total_livros'] == total
+    assert servidor.buscar(3)[1]['titulo'] == 'NOVO'
+
+
+def test_recusa_desfaz_escrita_otimista(servidor):
+    catalogo = catalogo_carregado(servidor)
+    titulo = catalogo.snapshot.dataframe().loc[7, 'Título']
+    servidor.excluir(7)  # excluído por outra sessão; o snapshot ainda o tem
+
+    with pytest.raises(requests.HTTPError) as erro:
+        catalogo.atualizar_livro(7, LIVRO)
+    assert erro.value.response.status_code == 404
+    # O valor otimista não fica: volta o anterior e a reconciliação tira o livro
+    assert catalogo.snapshot._df['Título'].get(7, titulo) == titulo
+    esperar(lambda: 7 not in catalogo.snapshot._df.index)
+    assert_igual_ao_backend(catalogo, servidor)
+
+
+def test_exclusao_recusada_nao_apaga_do_snapshot(servidor):
+    catalogo = catalogo_carregado(servidor)
+    with pytest.raises(requests.HTTPError):
+        catalogo.excluir_livro(999)
+    assert len(catalogo.snapshot.dataframe()) == 50
+    assert catalogo.obter_agregados()['total_livros'] == 50
+
+
+def test_resposta_perdida_depois_do_commit_mantem_o_gravado(servidor):
+    catalogo = catalogo_carregado(servidor, timeout=(1, 0.3), tentativas=0)
+    servidor.atraso_escrita = 1
+
+    with pytest.raises(requests.exceptions.RequestException):
+        catalogo.atualizar_livro(3, LIVRO)
+    servidor.atraso_escrita = 0
+
+    # A escrita foi gravada: o snapshot fica com o estado do backend, não com o anterior
+    assert servidor.buscar(3)[1]['titulo'] == 'NOVO'
+    assert catalogo.snapshot._df.loc[3, 'Título'] == 'NOVO'
+    catalogo.snapshot.sincronizar(forcar=True)
+    assert_igual_ao_backend(catalogo, servidor)
+
+
+def test_evento_em_ordem_e_aplicado(servidor):
+    catalogo = catalogo_carregado(servidor)
+    seq = catalogo.snapshot.seq
+    servidor.atualizar(4, LIVRO)
+
+    assert catalogo.snapshot.aplicar_evento(delta_desde(servidor, seq), seq)
+    assert catalogo.snapshot._df.loc[4, 'Título'] == 'NOVO'
+    assert_igual_ao_backend(catalogo, servidor)
+
+
+def test_evento_repetido_e_ignorado(servidor):
+    catalogo = catalogo_carregado(servidor)
+    seq = catalogo.snapshot.seq
+    servidor.atualizar(4, LIVRO)
+    delta = delta_desde(servidor, seq)
+    assert catalogo.snapshot.aplicar_evento(delta, seq)
+    aplicacoes = catalogo.snapshot.sincronizacoes_delta
+
+    assert not catalogo.snapshot.aplicar_evento(delta, seq)
+    assert catalogo.snapshot.sincronizacoes_delta == aplicacoes
+
+
+def test_evento_com_lacuna_pede_sincronizacao(servidor):
+    catalogo = catalogo_carregado(servidor)
+    seq = catalogo.snapshot.seq
+    servidor.atualizar(4, LIVRO)
+    servidor.excluir(6)
+    # Evento calculado depois de uma alteração que este processo não viu
+    delta = delta_desde(servidor, seq + 1)
+
+    assert not catalogo.snapshot.aplicar_evento(delta, seq + 1)
+    assert catalogo.snapshot.seq == seq
+    assert 6 in catalogo.snapshot._df.index
+    assert catalogo.snapshot.sincronizado_em == float('-inf')
+
+    catalogo.snapshot.sincronizar(forcar=True)
+    assert 6 not in catalogo.snapshot._df.index
+    assert_igual_ao_backend(catalogo, servidor)
+
+
+def test_sincronizacao_por_delta(servidor):
+    catalogo = catalogo_carregado(servidor)
+    servidor.atualizar(2, LIVRO)
+    _, criado, _ = servidor.criar(LIVRO)
+    servidor.excluir(9)
+
+    catalogo.snapshot.sincronizar(forcar=True)
+
+    assert catalogo.snapshot.cargas_completas == 1
+    assert catalogo.snapshot.sincronizacoes_delta == 1
+    assert catalogo.snapshot.linhas_delta == 3
+    assert criado['id'] in catalogo.snapshot._df.index
+    assert_igual_ao_backend(catalogo, servidor)
+
+
+def test_indice_acompanha_o_delta(servidor):
+    catalogo = catalogo_carregado(servidor)
+    indice, _ = catalogo.obter_indice()
+    _, criado, _ = servidor.criar({**LIVRO, 'titulo': 'Zebulom Quixotesco'})
+
+    catalogo.snapshot.sincronizar(forcar=True)
+
+    assert catalogo.sugerir('zebulom')[0][0] == criado['id']
+    assert catalogo.obter_indice()[0]._base is indice._base
@@ -2,8 +2,16 @@ package main
 
 import (
 	"database/sql"
+	"encoding/json"
+	"fmt"
 	"log"
 	"net/http"
+	"strconv"
+	"strings"
+	"sync"
+	"sync/atomic"
+	"time"
+	"unicode"
 
 	"github.com/gin-gonic/gin"
 	_ "modernc.org/sqlite"
@@ -19,9 +27,45 @@ type Livro struct {
 
 var db *sql.DB
 
+// Versão do catálogo, incrementada a cada escrita; usada como ETag do GET /livros
+var (
+	inicioServidor = strconv.FormatInt(time.Now().UnixNano(), 36)
+	versaoCatalogo atomic.Int64
+)
+
+func etagCatalogo() string {
+	return fmt.Sprintf(`W/"%s-%d"`, inicioServidor, versaoCatalogo.Load())
+}
+
+// Aviso de escrita para os assinantes de /livros/eventos: o canal atual é
+// fechado a cada escrita (acordando todos) e trocado por um novo
+var (
+	muAviso        sync.Mutex
+	avisoAlteracao = make(chan struct{})
+)
+
+// registrarEscrita muda a versão do catálogo e acorda os assinantes
+func registrarEscrita() {
+	versaoCatalogo.Add(1)
+	muAviso.Lock()
+	close(avisoAlteracao)
+	avisoAlteracao = make(chan struct{})
+	muAviso.Unlock()
+}
+
+func proximaAlteracao() <-chan struct{} {
+	muAviso.Lock()
+	defer muAviso.Unlock()
+	return avisoAlteracao
+}
+
+// WAL: leituras não bloqueiam a escrita (e vice-versa); busy_timeout espera
+// pelo lock em vez de falhar com SQLITE_BUSY sob escrita concorrente
+const dsnBanco = "file:./biblioteca.db?_pragma=journal_mode(WAL)&_pragma=busy_timeout(5000)&_pragma=synchronous(NORMAL)"
+
 func inicializarBD() error {
 	var err error
-	db, err = sql.Open("sqlite", "./biblioteca.db")
+	db, err = sql.Open("sqlite", dsnBanco)
 	if err != nil {
 		return err
 	}
@@ -36,9 +80,192 @@ func inicializarBD() error {
             categoria TEXT
         )
     `)
+	if err != nil {
+		return err
+	}
+
+	// Log de alterações para sincronização incremental (preenchido por triggers)
+	_, err = db.Exec(`
+        CREATE TABLE IF NOT EXISTS livros_alteracoes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            livro_id INTEGER NOT NULL,
+            operacao TEXT NOT NULL,
+            momento TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TRIGGER IF NOT EXISTS livros_ai AFTER INSERT ON livros BEGIN
+            INSERT INTO livros_alteracoes (livro_id, operacao) VALUES (NEW.id, 'I');
+        END;
+        CREATE TRIGGER IF NOT EXISTS livros_au AFTER UPDATE ON livros BEGIN
+            INSERT INTO livros_alteracoes (livro_id, operacao) VALUES (NEW.id, 'U');
+        END;
+        CREATE TRIGGER IF NOT EXISTS livros_ad AFTER DELETE ON livros BEGIN
+            INSERT INTO livros_alteracoes (livro_id, operacao) VALUES (OLD.id, 'D');
+        END;
+    `)
+	if err != nil {
+		return err
+	}
+
+	// Índices para os filtros de gênero/categoria e agrupamentos por autor
+	_, err = db.Exec(`
+        CREATE INDEX IF NOT EXISTS idx_livros_autor ON livros(autor);
+        CREATE INDEX IF NOT EXISTS idx_livros_genero ON livros(genero);
+        CREATE INDEX IF NOT EXISTS idx_livros_categoria ON livros(categoria);
+    `)
+	if err != nil {
+		return err
+	}
+
+	if err = criarIndiceTextual(); err != nil {
+		return err
+	}
+	return prepararConsultas()
+}
+
+// criarIndiceTextual cria a tabela FTS5 de título/autor, mantida por
+// triggers; em um banco já populado, o índice é construído na criação
+func criarIndiceTextual() error {
+	var existe int
+	err := db.QueryRow("SELECT COUNT(*) FROM sqlite_master WHERE name = 'livros_fts'").Scan(&existe)
+	if err != nil {
+		return err
+	}
+
+	_, err = db.Exec(`
+        CREATE VIRTUAL TABLE IF NOT EXISTS livros_fts USING fts5(
+            titulo, autor,
+            content='livros', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        );
+        CREATE TRIGGER IF NOT EXISTS livros_fts_ai AFTER INSERT ON livros BEGIN
+            INSERT INTO livros_fts (rowid, titulo, autor) VALUES (NEW.id, NEW.titulo, NEW.autor);
+        END;
+        CREATE TRIGGER IF NOT EXISTS livros_fts_ad AFTER DELETE ON livros BEGIN
+            INSERT INTO livros_fts (livros_fts, rowid, titulo, autor) VALUES ('delete', OLD.id, OLD.titulo, OLD.autor);
+        END;
+        CREATE TRIGGER IF NOT EXISTS livros_fts_au AFTER UPDATE ON livros BEGIN
+            INSERT INTO livros_fts (livros_fts, rowid, titulo, autor) VALUES ('delete', OLD.id, OLD.titulo, OLD.autor);
+            INSERT INTO livros_fts (rowid, titulo, autor) VALUES (NEW.id, NEW.titulo, NEW.autor);
+        END;
+    `)
+	if err != nil || existe > 0 {
+		return err
+	}
+	_, err = db.Exec("INSERT INTO livros_fts (livros_fts) VALUES ('rebuild')")
 	return err
 }
 
+// Consultas fixas, preparadas uma única vez na inicialização
+var (
+	stmtSeqCatalogo    *sql.Stmt
+	stmtAlteracoes     *sql.Stmt
+	stmtBuscarLivro    *sql.Stmt
+	stmtInserirLivro   *sql.Stmt
+	stmtAtualizarLivro *sql.Stmt
+	stmtDeletarLivro   *sql.Stmt
+)
+
+func prepararConsultas() error {
+	consultas := []struct {
+		destino  **sql.Stmt
+		consulta string
+	}{
+		{&stmtSeqCatalogo, consultaSeqCatalogo},
+		{&stmtAlteracoes, `
+            SELECT a.livro_id, l.id, l.titulo, l.autor, l.genero, l.categoria
+            FROM (SELECT DISTINCT livro_id FROM livros_alteracoes WHERE seq > ?) a
+            LEFT JOIN livros l ON l.id = a.livro_id
+            ORDER BY a.livro_id`},
+		{&stmtBuscarLivro, "SELECT id, titulo, autor, genero, categoria FROM livros WHERE id = ?"},
+		{&stmtInserirLivro, "INSERT INTO livros (titulo, autor, genero, categoria) VALUES (?, ?, ?, ?)"},
+		{&stmtAtualizarLivro, "UPDATE livros SET titulo = ?, autor = ?, genero = ?, categoria = ? WHERE id = ?"},
+		{&stmtDeletarLivro, "DELETE FROM livros WHERE id = ?"},
+	}
+	for _, c := range consultas {
+		stmt, err := db.Prepare(c.consulta)
+		if err != nil {
+			return err
+		}
+		*c.destino = stmt
+	}
+	return nil
+}
+
+// As consultas de listagem variam só na forma (quais filtros e quantos
+// valores); cada forma é preparada uma vez e reaproveitada, até um limite
+const maximoConsultasPreparadas = 256
+
+var (
+	consultasPreparadas      sync.Map
+	totalConsultasPreparadas atomic.Int64
+)
+
+// consultaPreparada devolve a instrução em cache para a consulta, ou nil
+// se o cache estiver cheio (ex.: listas de filtros incomuns)
+func consultaPreparada(consulta string) (*sql.Stmt, error) {
+	if stmt, ok := consultasPreparadas.Load(consulta); ok {
+		return stmt.(*sql.Stmt), nil
+	}
+	if totalConsultasPreparadas.Load() >= maximoConsultasPreparadas {
+		return nil, nil
+	}
+	stmt, err := db.Prepare(consulta)
+	if err != nil {
+		return nil, err
+	}
+	if anterior, existia := consultasPreparadas.LoadOrStore(consulta, stmt); existia {
+		stmt.Close()
+		return anterior.(*sql.Stmt), nil
+	}
+	totalConsultasPreparadas.Add(1)
+	return stmt, nil
+}
+
+func consultar(consulta string, args ...any) (*sql.Rows, error) {
+	stmt, err := consultaPreparada(consulta)
+	if err != nil {
+		return nil, err
+	}
+	if stmt == nil {
+		return db.Query(consulta, args...)
+	}
+	return stmt.Query(args...)
+}
+
+func contar(consulta string, args ...any) (int, error) {
+	stmt, err := consultaPreparada(consulta)
+	if err != nil {
+		return 0, err
+	}
+	var total int
+	if stmt == nil {
+		err = db.QueryRow(consulta, args...).Scan(&total)
+	} else {
+		err = stmt.QueryRow(args...).Scan(&total)
+	}
+	return total, err
+}
+
+type Alteracoes struct {
+	Seq       int64   `json:"seq"`
+	Alterados []Livro `json:"alterados"`
+	Excluidos []int   `json:"excluidos"`
+}
+
+type ErroLote struct {
+	Indice int    `json:"indice"`
+	Erro   string `json:"erro"`
+}
+
+type ResultadoLote struct {
+	Criados []Livro    `json:"criados"`
+	Erros   []ErroLote `json:"erros"`
+}
+
+const tamanhoMaximoLote = 5000
+
+const consultaSeqCatalogo = "SELECT COALESCE(MAX(seq), 0) FROM livros_alteracoes"
+
 func main() {
 	// Inicializar banco de dados
 	if err := inicializarBD(); err != nil {
@@ -54,7 +281,8 @@ func main() {
 	r.Use(func(c *gin.Context) {
 		c.Header("Access-Control-Allow-Origin", "*")
 		c.Header("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS")
-		c.Header("Access-Control-Allow-Headers", "Origin, Content-Type")
+		c.Header("Access-Control-Allow-Headers", "Origin, Content-Type, If-None-Match, Last-Event-ID")
+		c.Header("Access-Control-Expose-Headers", "ETag, X-Total-Count, X-Total-Acervo, X-Catalogo-Seq")
 
 		if c.Request.Method == "OPTIONS" {
 			c.AbortWithStatus(204)
@@ -65,8 +293,11 @@ func main() {
 
 	// Rotas
 	r.GET("/livros", buscarLivros)
+	r.GET("/livros/alteracoes", buscarAlteracoes)
+	r.GET("/livros/eventos", transmitirAlteracoes)
 	r.GET("/livros/:id", buscarLivro)
 	r.POST("/livros", criarLivro)
+	r.POST("/livros/lote", criarLivrosLote)
 	r.PUT("/livros/:id", atualizarLivro)
 	r.DELETE("/livros/:id", deletarLivro)
 
@@ -77,15 +308,143 @@ func main() {
 	}
 }
 
+const limiteMaximoPagina = 1000
+
+// escaparLike protege os curingas do LIKE para que a busca seja literal
+func escaparLike(texto string) string {
+	texto = strings.ReplaceAll(texto, `\`, `\\`)
+	texto = strings.ReplaceAll(texto, "%", `\%`)
+	return strings.ReplaceAll(texto, "_", `\_`)
+}
+
+// consultaTextual converte a busca em uma consulta FTS5: cada palavra vira
+// um prefixo entre aspas ("dom"* "casm"*) e todas precisam aparecer
+func consultaTextual(busca string) string {
+	palavras := strings.FieldsFunc(busca, func(r rune) bool {
+		return !unicode.IsLetter(r) && !unicode.IsNumber(r)
+	})
+	termos := make([]string, len(palavras))
+	for i, palavra := range palavras {
+		termos[i] = `"` + palavra + `"*`
+	}
+	return strings.Join(termos, " ")
+}
+
+// filtrosLivros monta a cláusula WHERE a partir dos parâmetros de busca
+func filtrosLivros(c *gin.Context) (string, []any) {
+	var condicoes []string
+	var args []any
+
+	if busca := strings.TrimSpace(c.Query("busca")); busca != "" {
+		if consulta := consultaTextual(busca); consulta != "" {
+			// Índice FTS5 (sem acentos e sem caixa) em vez de varrer a tabela com LIKE
+			condicoes = append(condicoes, "id IN (SELECT rowid FROM livros_fts WHERE livros_fts MATCH ?)")
+			args = append(args, consulta)
+		} else {
+			// Só pontuação: não há palavras para o índice, busca literal
+			padrao := "%" + escaparLike(busca) + "%"
+			condicoes = append(condicoes, `(titulo LIKE ? ESCAPE '\' OR autor LIKE ? ESCAPE '\')`)
+			args = append(args, padrao, padrao)
+		}
+	}
+
+	for _, coluna := range []string{"genero", "categoria"} {
+		valores := c.QueryArray(coluna)
+		if len(valores) == 0 {
+			continue
+		}
+		marcadores := strings.TrimSuffix(strings.Repeat("?, ", len(valores)), ", ")
+		condicoes = append(condicoes, coluna+" IN ("+marcadores+")")
+		for _, v := range valores {
+			args = append(args, v)
+		}
+	}
+
+	if len(condicoes) == 0 {
+		return "", args
+	}
+	return " WHERE " + strings.Join(condicoes, " AND "), args
+}
+
 func buscarLivros(c *gin.Context) {
-	rows, err := db.Query("SELECT id, titulo, autor, genero, categoria FROM livros")
+	// A ETag é lida antes da consulta: uma escrita concorrente só torna a
+	// resposta mais nova que a versão anunciada, nunca mais antiga
+	etag := etagCatalogo()
+	if c.GetHeader("If-None-Match") == etag {
+		c.Status(http.StatusNotModified)
+		return
+	}
+	c.Header("ETag", etag)
+
+	// Seq lida antes dos dados: reaplicar alterações a partir dela é idempotente
+	var seq int64
+	if err := stmtSeqCatalogo.QueryRow().Scan(&seq); err != nil {
+		c.JSON(http.StatusInternalServerError, gin.H{"erro": err.Error()})
+		return
+	}
+	c.Header("X-Catalogo-Seq", strconv.FormatInt(seq, 10))
+
+	where, args := filtrosLivros(c)
+	paginacao := ""
+
+	// Paginação opcional: sem "limite" o catálogo filtrado vem inteiro
+	if limiteParam, ok := c.GetQuery("limite"); ok {
+		limite, err := strconv.Atoi(limiteParam)
+		if err != nil || limite < 0 || limite > limiteMaximoPagina {
+			c.JSON(http.StatusBadRequest, gin.H{"erro": "Parâmetro limite inválido"})
+			return
+		}
+
+		if aposParam, ok := c.GetQuery("apos"); ok {
+			// Cursor por chave: continua depois do último ID recebido, sem
+			// OFFSET nem contagens (usado para percorrer o catálogo inteiro)
+			apos, err := strconv.ParseInt(aposParam, 10, 64)
+			if err != nil {
+				c.JSON(http.StatusBadRequest, gin.H{"erro": "Parâmetro apos inválido"})
+				return
+			}
+			if where == "" {
+				where = " WHERE id > ?"
+			} else {
+				where += " AND id > ?"
+			}
+			args = append(args, apos)
+			paginacao = " LIMIT ?"
+			args = append(args, limite)
+		} else {
+			offset, err := strconv.Atoi(c.DefaultQuery("offset", "0"))
+			if err != nil || offset < 0 {
+				c.JSON(http.StatusBadRequest, gin.H{"erro": "Parâmetro offset inválido"})
+				return
+			}
+
+			totalFiltrado, err := contar("SELECT COUNT(*) FROM livros"+where, args...)
+			if err != nil {
+				c.JSON(http.StatusInternalServerError, gin.H{"erro": err.Error()})
+				return
+			}
+			totalAcervo, err := contar("SELECT COUNT(*) FROM livros")
+			if err != nil {
+				c.JSON(http.StatusInternalServerError, gin.H{"erro": err.Error()})
+				return
+			}
+			c.Header("X-Total-Count", strconv.Itoa(totalFiltrado))
+			c.Header("X-Total-Acervo", strconv.Itoa(totalAcervo))
+
+			paginacao = " LIMIT ? OFFSET ?"
+			args = append(args, limite, offset)
+		}
+	}
+
+	consulta := "SELECT id, titulo, autor, genero, categoria FROM livros" + where + " ORDER BY id" + paginacao
+	rows, err := consultar(consulta, args...)
 	if err != nil {
 		c.JSON(http.StatusInternalServerError, gin.H{"erro": err.Error()})
 		return
 	}
 	defer rows.Close()
 
-	var livros []Livro
+	livros := []Livro{}
 	for rows.Next() {
 		var l Livro
 		if err := rows.Scan(&l.ID, &l.Titulo, &l.Autor, &l.Genero, &l.Categoria); err != nil {
@@ -98,12 +457,134 @@ func buscarLivros(c *gin.Context) {
 	c.JSON(http.StatusOK, livros)
 }
 
+// lerAlteracoes lê os livros criados/alterados e os IDs excluídos desde uma seq
+func lerAlteracoes(desde int64) (Alteracoes, error) {
+	alteracoes := Alteracoes{Alterados: []Livro{}, Excluidos: []int{}}
+
+	// Transação de leitura para que seq e linhas venham do mesmo snapshot
+	tx, err := db.Begin()
+	if err != nil {
+		return alteracoes, err
+	}
+	defer tx.Rollback()
+
+	if err := tx.Stmt(stmtSeqCatalogo).QueryRow().Scan(&alteracoes.Seq); err != nil {
+		return alteracoes, err
+	}
+
+	rows, err := tx.Stmt(stmtAlteracoes).Query(desde)
+	if err != nil {
+		return alteracoes, err
+	}
+	defer rows.Close()
+
+	for rows.Next() {
+		var livroID int
+		var id sql.NullInt64
+		var titulo, autor, genero, categoria sql.NullString
+		if err := rows.Scan(&livroID, &id, &titulo, &autor, &genero, &categoria); err != nil {
+			return alteracoes, err
+		}
+		if !id.Valid {
+			alteracoes.Excluidos = append(alteracoes.Excluidos, livroID)
+			continue
+		}
+		alteracoes.Alterados = append(alteracoes.Alterados, Livro{
+			ID:        livroID,
+			Titulo:    titulo.String,
+			Autor:     autor.String,
+			Genero:    genero.String,
+			Categoria: categoria.String,
+		})
+	}
+	return alteracoes, rows.Err()
+}
+
+// buscarAlteracoes devolve os livros criados/alterados e os IDs excluídos desde uma seq
+func buscarAlteracoes(c *gin.Context) {
+	desde, err := strconv.ParseInt(c.DefaultQuery("desde", "0"), 10, 64)
+	if err != nil || desde < 0 {
+		c.JSON(http.StatusBadRequest, gin.H{"erro": "Parâmetro desde inválido"})
+		return
+	}
+
+	alteracoes, err := lerAlteracoes(desde)
+	if err != nil {
+		c.JSON(http.StatusInternalServerError, gin.H{"erro": err.Error()})
+		return
+	}
+
+	c.JSON(http.StatusOK, alteracoes)
+}
+
+// Intervalo dos comentários de keep-alive no fluxo de eventos, para que
+// proxies não derrubem a conexão ociosa
+const intervaloKeepAlive = 15 * time.Second
+
+// transmitirAlteracoes é um fluxo SSE: a cada escrita envia um evento
+// "alteracoes" com o mesmo corpo de /livros/alteracoes desde o evento
+// anterior, tendo a seq como id. Na reconexão, Last-Event-ID (ou ?desde=)
+// retoma de onde parou; sem nenhum dos dois, começa da seq atual.
+func transmitirAlteracoes(c *gin.Context) {
+	inicio := c.GetHeader("Last-Event-ID")
+	if inicio == "" {
+		inicio = c.Query("desde")
+	}
+	var desde int64
+	if inicio == "" {
+		if err := stmtSeqCatalogo.QueryRow().Scan(&desde); err != nil {
+			c.JSON(http.StatusInternalServerError, gin.H{"erro": err.Error()})
+			return
+		}
+	} else {
+		var err error
+		if desde, err = strconv.ParseInt(inicio, 10, 64); err != nil || desde < 0 {
+			c.JSON(http.StatusBadRequest, gin.H{"erro": "Parâmetro desde inválido"})
+			return
+		}
+	}
+
+	c.Header("Content-Type", "text/event-stream")
+	c.Header("Cache-Control", "no-cache")
+	c.Header("X-Accel-Buffering", "no")
+	c.Status(http.StatusOK)
+	fmt.Fprintf(c.Writer, "retry: 3000\n: seq %d\n\n", desde)
+	c.Writer.Flush()
+
+	keepAlive := time.NewTicker(intervaloKeepAlive)
+	defer keepAlive.Stop()
+	for {
+		// Pega o aviso antes de ler: uma escrita durante a leitura não se perde
+		aviso := proximaAlteracao()
+		alteracoes, err := lerAlteracoes(desde)
+		if err != nil {
+			log.Println("Erro ao ler alterações para o fluxo de eventos:", err)
+			return
+		}
+		if alteracoes.Seq != desde {
+			dados, err := json.Marshal(alteracoes)
+			if err != nil {
+				return
+			}
+			fmt.Fprintf(c.Writer, "id: %d\nevent: alteracoes\ndata: %s\n\n", alteracoes.Seq, dados)
+			c.Writer.Flush()
+			desde = alteracoes.Seq
+		}
+
+		select {
+		case <-aviso:
+		case <-keepAlive.C:
+			fmt.Fprint(c.Writer, ": keep-alive\n\n")
+			c.Writer.Flush()
+		case <-c.Request.Context().Done():
+			return
+		}
+	}
+}
+
 func buscarLivro(c *gin.Context) {
 	var livro Livro
-	err := db.QueryRow(
-		"SELECT id, titulo, autor, genero, categoria FROM livros WHERE id = ?",
-		c.Param("id"),
-	).Scan(&livro.ID, &livro.Titulo, &livro.Autor, &livro.Genero, &livro.Categoria)
+	err := stmtBuscarLivro.QueryRow(c.Param("id")).Scan(&livro.ID, &livro.Titulo, &livro.Autor, &livro.Genero, &livro.Categoria)
 
 	if err == sql.ErrNoRows {
 		c.JSON(http.StatusNotFound, gin.H{"erro": "Livro não encontrado"})
@@ -123,20 +604,69 @@ func criarLivro(c *gin.Context) {
 		return
 	}
 
-	result, err := db.Exec(
-		"INSERT INTO livros (titulo, autor, genero, categoria) VALUES (?, ?, ?, ?)",
-		livro.Titulo, livro.Autor, livro.Genero, livro.Categoria,
-	)
+	result, err := stmtInserirLivro.Exec(livro.Titulo, livro.Autor, livro.Genero, livro.Categoria)
 	if err != nil {
 		c.JSON(http.StatusInternalServerError, gin.H{"erro": err.Error()})
 		return
 	}
 
+	registrarEscrita()
+
 	id, _ := result.LastInsertId()
 	livro.ID = int(id)
 	c.JSON(http.StatusCreated, livro)
 }
 
+// criarLivrosLote insere um lote de livros em uma única transação; linhas
+// inválidas são reportadas em "erros" sem impedir a gravação das demais
+func criarLivrosLote(c *gin.Context) {
+	var livros []Livro
+	if err := c.BindJSON(&livros); err != nil {
+		c.JSON(http.StatusBadRequest, gin.H{"erro": err.Error()})
+		return
+	}
+	if len(livros) > tamanhoMaximoLote {
+		c.JSON(http.StatusRequestEntityTooLarge, gin.H{"erro": fmt.Sprintf("Lote maior que %d livros", tamanhoMaximoLote)})
+		return
+	}
+
+	tx, err := db.Begin()
+	if err != nil {
+		c.JSON(http.StatusInternalServerError, gin.H{"erro": err.Error()})
+		return
+	}
+	defer tx.Rollback()
+
+	stmt := tx.Stmt(stmtInserirLivro)
+	defer stmt.Close()
+
+	resultado := ResultadoLote{Criados: []Livro{}, Erros: []ErroLote{}}
+	for i, livro := range livros {
+		if strings.TrimSpace(livro.Titulo) == "" || strings.TrimSpace(livro.Autor) == "" {
+			resultado.Erros = append(resultado.Erros, ErroLote{Indice: i, Erro: "Título e autor são obrigatórios"})
+			continue
+		}
+		res, err := stmt.Exec(livro.Titulo, livro.Autor, livro.Genero, livro.Categoria)
+		if err != nil {
+			resultado.Erros = append(resultado.Erros, ErroLote{Indice: i, Erro: err.Error()})
+			continue
+		}
+		id, _ := res.LastInsertId()
+		livro.ID = int(id)
+		resultado.Criados = append(resultado.Criados, livro)
+	}
+
+	if err := tx.Commit(); err != nil {
+		c.JSON(http.StatusInternalServerError, gin.H{"erro": err.Error()})
+		return
+	}
+	if len(resultado.Criados) > 0 {
+		registrarEscrita()
+	}
+
+	c.JSON(http.StatusOK, resultado)
+}
+
 func atualizarLivro(c *gin.Context) {
 	var livro Livro
 	if err := c.BindJSON(&livro); err != nil {
@@ -144,24 +674,31 @@ func atualizarLivro(c *gin.Context) {
 		return
 	}
 
-	_, err := db.Exec(
-		"UPDATE livros SET titulo = ?, autor = ?, genero = ?, categoria = ? WHERE id = ?",
-		livro.Titulo, livro.Autor, livro.Genero, livro.Categoria, c.Param("id"),
-	)
+	result, err := stmtAtualizarLivro.Exec(livro.Titulo, livro.Autor, livro.Genero, livro.Categoria, c.Param("id"))
 	if err != nil {
 		c.JSON(http.StatusInternalServerError, gin.H{"erro": err.Error()})
 		return
 	}
+	if afetados, _ := result.RowsAffected(); afetados == 0 {
+		c.JSON(http.StatusNotFound, gin.H{"erro": "Livro não encontrado"})
+		return
+	}
+	registrarEscrita()
 
 	c.JSON(http.StatusOK, livro)
 }
 
 func deletarLivro(c *gin.Context) {
-	_, err := db.Exec("DELETE FROM livros WHERE id = ?", c.Param("id"))
+	result, err := stmtDeletarLivro.Exec(c.Param("id"))
 	if err != nil {
 		c.JSON(http.StatusInternalServerError, gin.H{"erro": err.Error()})
 		return
 	}
+	if afetados, _ := result.RowsAffected(); afetados == 0 {
+		c.JSON(http.StatusNotFound, gin.H{"erro": "Livro não encontrado"})
+		return
+	}
+	registrarEscrita()
 
 	c.Status(http.StatusNoContent)
 }
@@ -0,0 +1,81 @@
+import json
+import os
+import sqlite3
+import threading
+
+
+class RepositorioUsuarios:
+    """Usuários em uma tabela SQLite com chave primária no username.
+
+    Leituras são buscas pela chave, sem carregar os demais usuários; o
+    cadastro é um único INSERT, então dois registros simultâneos do mesmo
+    nome não se sobrescrevem (o segundo falha). Cada thread usa a sua
+    própria conexão.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._local = threading.local()
+        with self._conexao() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS usuarios (
+                    username TEXT PRIMARY KEY,
+                    password TEXT NOT NULL,
+                    role TEXT NOT NULL,
+                    name TEXT NOT NULL
+                )
+            """)
+
+    def _conexao(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.caminho, timeout=30)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def buscar(self, username):
+        linha = self._conexao().execute(
+            "SELECT username, password, role, name FROM usuarios WHERE username = ?",
+            (username,)
+        ).fetchone()
+        return dict(linha) if linha else None
+
+    def criar(self, username, password, role, name):
+        """Insere o usuário; devolve False se o username já existir."""
+        try:
+            with self._conexao() as conn:
+                conn.execute(
+                    "INSERT INTO usuarios (username, password, role, name) VALUES (?, ?, ?, ?)",
+                    (username, password, role, name)
+                )
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    def atualizar_senha(self, username, password):
+        with self._conexao() as conn:
+            conn.execute("UPDATE usuarios SET password = ? WHERE username = ?", (password, username))
+
+    def total(self):
+        return self._conexao().execute("SELECT COUNT(*) FROM usuarios").fetchone()[0]
+
+    def importar(self, usuarios):
+        """Importa um dicionário no formato do antigo users.json
+        ({username: {password, role, name}}) em uma transação.
+        Usuários já existentes são mantidos. Devolve quantos entraram."""
+        with self._conexao() as conn:
+            cursor = conn.executemany(
+                "INSERT OR IGNORE INTO usuarios (username, password, role, name) VALUES (?, ?, ?, ?)",
+                [(username, dados['password'], dados['role'], dados['name'])
+                 for username, dados in usuarios.items()]
+            )
+        return cursor.rowcount
+
+    def migrar_json(self, caminho_json):
+        """Migra o users.json para a tabela, se ainda não houver usuários."""
+        if self.total() > 0 or not os.path.exists(caminho_json):
+            return 0
+        with open(caminho_json, 'r') as f:
+            return self.importar(json.load(f))
@@ -0,0 +1,59 @@
+import threading
+from concurrent.futures import Future
+
+import metricas
+
+
+class VooUnico:
+    """Coalescência de chamadas idênticas (single-flight).
+
+    Enquanto uma chamada com a mesma chave está em andamento, as demais
+    não repetem o trabalho: esperam por ela e recebem o mesmo resultado
+    (ou a mesma exceção). Assim a carga no backend não cresce com o
+    número de sessões abrindo a mesma página ao mesmo tempo.
+    """
+
+    def __init__(self, nome):
+        self.nome = nome
+        self._lock = threading.Lock()
+        self._em_voo = {}
+        self.emitidas = 0
+        self.coalescidas = 0
+
+    def executar(self, chave, funcao):
+        with self._lock:
+            futuro = self._em_voo.get(chave)
+            lider = futuro is None
+            if lider:
+                futuro = self._em_voo[chave] = Future()
+                self.emitidas += 1
+            else:
+                self.coalescidas += 1
+        if not lider:
+            metricas.contar(f'{self.nome}_coalescida')
+            return futuro.result()
+
+        metricas.contar(f'{self.nome}_emitida')
+        try:
+            resultado = funcao()
+        except BaseException as e:
+            futuro.set_exception(e)
+            raise
+        else:
+            futuro.set_result(resultado)
+            return resultado
+        finally:
+            with self._lock:
+                del self._em_voo[chave]
+
+    def estatisticas(self):
+        return {'emitidas': self.emitidas, 'coalescidas': self.coalescidas}
+
+
+def congelar(valor):
+    """Versão imutável (hashable) de params/cabeçalhos, para usar como chave."""
+    if isinstance(valor, dict):
+        return tuple(sorted((nome, congelar(v)) for nome, v in valor.items()))
+    if isinstance(valor, (list, tuple)):
+        return tuple(congelar(v) for v in valor)
+    return valor